@@ -38,4 +38,7 @@ HEADERS = {
 }
 
 REQUEST_DELAY = 0.5  # seconds between requests
+LOCAL_UTC_OFFSET = -6  # hours; league local time (Regina: CST all year, no DST)
 DB_PATH = "../data/cards.db"
+SNAPSHOT_PATH = "../data/cards.published.db"  # read-only copy served to web/
+ARCHIVE_PATH = "../data/cards.archive.db"     # closed seasons, see --archive-season
@@ -1,6 +1,8 @@
 import sqlite3
 import os
-from config import DB_PATH, DIVISIONS
+import re
+from datetime import datetime, timedelta, timezone
+from config import ARCHIVE_PATH, DB_PATH, DIVISIONS, LOCAL_UTC_OFFSET, SNAPSHOT_PATH
 
 
 def get_db_path() -> str:
@@ -8,6 +10,30 @@ def get_db_path() -> str:
     return os.path.join(base, DB_PATH)
 
 
+def get_snapshot_path() -> str:
+    base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, SNAPSHOT_PATH)
+
+
+def get_archive_path() -> str:
+    base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, ARCHIVE_PATH)
+
+
+# Connection tuning applied to every scraper connection.
+# NORMAL sync is durable across application crashes in WAL mode and only
+# risks the last commit on power loss, which a re-scrape recovers anyway.
+CONNECTION_PRAGMAS = {
+    "synchronous":        "NORMAL",
+    "cache_size":         -32000,       # KiB (negative) → ~32 MB page cache
+    "mmap_size":          268435456,    # 256 MB memory-mapped reads
+    "temp_store":         "MEMORY",
+    "busy_timeout":       5000,         # ms to wait on a locked DB
+    "journal_size_limit": 67108864,     # truncate the WAL back to 64 MB
+    "wal_autocheckpoint": 1000,         # pages
+}
+
+
 def get_connection() -> sqlite3.Connection:
     path = get_db_path()
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -15,12 +41,43 @@ def get_connection() -> sqlite3.Connection:
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
     conn.execute("PRAGMA journal_mode = WAL")
+    for name, value in CONNECTION_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def get_read_connection() -> sqlite3.Connection:
+    """
+    Read-only connection to the live DB with archived seasons attached (see
+    attach_archive), for queries that must count every season.  Unqualified
+    table names include archived rows; use main.<table> for live rows only.
+    """
+    conn = sqlite3.connect(f"file:{get_db_path()}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {CONNECTION_PRAGMAS['busy_timeout']}")
+    attach_archive(conn)
     return conn
 
 
+# Bump whenever init_db's schema or migrations change; on a DB already
+# stamped with this version (PRAGMA user_version) init_db only re-seeds.
+# 2: re-run backfills left unfinished by an interrupted version-1 migration.
+# 3: re-derive game_day from /Date(ms)/ values, once stored as the UTC date.
+SCHEMA_VERSION = 3
+
+
 def init_db() -> None:
     conn = get_connection()
     cur = conn.cursor()
+    if cur.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+        # Seeds follow config.DIVISIONS and KNOWN_CORRECTIONS, not the schema
+        # version — a division added to config must get its row.  Check with
+        # plain reads first so --status never takes the write lock.
+        if _seeds_missing(cur):
+            _seed(cur)
+            conn.commit()
+        conn.close()
+        return
 
     cur.executescript("""
         CREATE TABLE IF NOT EXISTS divisions (
@@ -35,41 +92,73 @@ def init_db() -> None:
             id INTEGER PRIMARY KEY,
             game_id INTEGER UNIQUE,
             division_id INTEGER,
+            season_id INTEGER,
             game_number TEXT,
             game_date TEXT,
+            game_day TEXT,      -- game_date normalised to YYYY-MM-DD
             location TEXT,
             home_team TEXT,
             away_team TEXT,
+            home_team_id INTEGER REFERENCES teams(id),
+            away_team_id INTEGER REFERENCES teams(id),
             scraped_at TEXT,
             FOREIGN KEY (division_id) REFERENCES divisions(id)
         );
 
-        CREATE TABLE IF NOT EXISTS misconducts (
+        -- Interned names.  Fact tables store these integer ids; the
+        -- misconducts / suspensions_served / printable_suspensions views
+        -- below join the names back in for the web pages.
+        CREATE TABLE IF NOT EXISTS teams (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+
+        CREATE TABLE IF NOT EXISTS players (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+
+        CREATE TABLE IF NOT EXISTS misconduct_facts (
             id INTEGER PRIMARY KEY,
             game_id INTEGER,
-            player_name TEXT,
+            player_id INTEGER,
             player_number TEXT,
-            team TEXT,
+            team_id INTEGER,
             minute TEXT,
             reason TEXT,
             card_type TEXT,
-            FOREIGN KEY (game_id) REFERENCES games(id)
+            FOREIGN KEY (game_id) REFERENCES games(id),
+            FOREIGN KEY (player_id) REFERENCES players(id),
+            FOREIGN KEY (team_id) REFERENCES teams(id)
         );
 
-        CREATE TABLE IF NOT EXISTS suspensions_served (
+        CREATE TABLE IF NOT EXISTS suspension_served_facts (
             id INTEGER PRIMARY KEY,
             game_id INTEGER,
-            player_name TEXT,
-            team TEXT,
-            FOREIGN KEY (game_id) REFERENCES games(id)
+            player_id INTEGER,
+            team_id INTEGER,
+            FOREIGN KEY (game_id) REFERENCES games(id),
+            FOREIGN KEY (player_id) REFERENCES players(id),
+            FOREIGN KEY (team_id) REFERENCES teams(id)
         );
 
-        CREATE TABLE IF NOT EXISTS printable_suspensions (
+        CREATE TABLE IF NOT EXISTS printable_suspension_facts (
             id INTEGER PRIMARY KEY,
             game_id INTEGER,
-            player_name TEXT,
-            team TEXT,
-            FOREIGN KEY (game_id) REFERENCES games(id)
+            player_id INTEGER,
+            team_id INTEGER,
+            FOREIGN KEY (game_id) REFERENCES games(id),
+            FOREIGN KEY (player_id) REFERENCES players(id),
+            FOREIGN KEY (team_id) REFERENCES teams(id)
+        );
+
+        -- Seasons moved to the archive DB by --archive-season.
+        -- max_game_pk keeps new games.id values clear of archived ones.
+        CREATE TABLE IF NOT EXISTS archived_seasons (
+            season_id INTEGER PRIMARY KEY,
+            archived_at TEXT,
+            games INTEGER,
+            max_game_pk INTEGER
         );
 
         -- Manual name corrections keyed by RAMP external game_id.
@@ -83,6 +172,83 @@ def init_db() -> None:
         );
     """)
 
+    _migrate(cur)
+    cur.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_games_game_day ON games(game_day);
+        CREATE INDEX IF NOT EXISTS idx_games_season ON games(season_id);
+        CREATE INDEX IF NOT EXISTS idx_games_home_team ON games(home_team_id);
+        CREATE INDEX IF NOT EXISTS idx_games_away_team ON games(away_team_id);
+        CREATE INDEX IF NOT EXISTS idx_misconduct_facts_game ON misconduct_facts(game_id);
+        CREATE INDEX IF NOT EXISTS idx_misconduct_facts_player ON misconduct_facts(player_id);
+        CREATE INDEX IF NOT EXISTS idx_misconduct_facts_team ON misconduct_facts(team_id);
+        CREATE INDEX IF NOT EXISTS idx_served_facts_game ON suspension_served_facts(game_id);
+        CREATE INDEX IF NOT EXISTS idx_served_facts_player ON suspension_served_facts(player_id);
+        CREATE INDEX IF NOT EXISTS idx_printable_facts_game ON printable_suspension_facts(game_id);
+        CREATE INDEX IF NOT EXISTS idx_printable_facts_player ON printable_suspension_facts(player_id);
+
+        -- Compatibility views: the shape of the original text-keyed tables,
+        -- plus the ids for callers that want integer joins / grouping.
+        CREATE VIEW IF NOT EXISTS misconducts AS
+        SELECT f.id, f.game_id, p.name AS player_name, f.player_number,
+               COALESCE(t.name, '') AS team, f.minute, f.reason, f.card_type,
+               f.player_id, f.team_id
+        FROM misconduct_facts f
+        LEFT JOIN players p ON p.id = f.player_id
+        LEFT JOIN teams t   ON t.id = f.team_id;
+
+        CREATE VIEW IF NOT EXISTS suspensions_served AS
+        SELECT f.id, f.game_id, p.name AS player_name, COALESCE(t.name, '') AS team,
+               f.player_id, f.team_id
+        FROM suspension_served_facts f
+        LEFT JOIN players p ON p.id = f.player_id
+        LEFT JOIN teams t   ON t.id = f.team_id;
+
+        CREATE VIEW IF NOT EXISTS printable_suspensions AS
+        SELECT f.id, f.game_id, p.name AS player_name, COALESCE(t.name, '') AS team,
+               f.player_id, f.team_id
+        FROM printable_suspension_facts f
+        LEFT JOIN players p ON p.id = f.player_id
+        LEFT JOIN teams t   ON t.id = f.team_id;
+    """)
+    _init_counters(cur)
+
+    _seed(cur)
+    cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+    conn.close()
+    print(f"DB initialised at {get_db_path()}")
+
+
+# Seed known name corrections (game_id = RAMP external GID).
+# These are applied at insert time so --full re-scrapes also pick them up.
+KNOWN_CORRECTIONS = [
+    # game_id (RAMP external GID), wrong_name, correct_name
+    (1707872, "khaed issa",           "Khaled Issa"),
+    (1707883, "Abdul Rahman  Nasser", "Abdulrahman Nasser"),
+    (1666700, "Carlos Gonzales",      "Carlos Gonzalez"),
+    (1666930, "mahmoud issa",         "Mahmoud Issa"),
+    (1667045, "mahmoud issa",         "Mahmoud Issa"),
+    (1666882, "shan dhillon",         "Shan Dhillon"),
+    (1667057, "riley meloche",        "Riley Meloche"),
+    (1666995, "SHAM WELDEMICHEL",     "Sham Weldemichel"),
+    (1667101, "sham weldemichel",     "Sham Weldemichel"),
+    (1666848, "Adebo Falase",         "Adeoba Falase"),
+    (1707887, "Sulliman Akbari",      "Suleman Akbari"),
+]
+
+
+def _seeds_missing(cur: sqlite3.Cursor) -> bool:
+    """True if a configured division or known correction has no row yet."""
+    divisions = {r[0] for r in cur.execute("SELECT division_id FROM divisions")}
+    corrections = {tuple(r) for r in cur.execute("SELECT game_id, wrong_name FROM name_corrections")}
+    return not (
+        DIVISIONS.keys() <= divisions
+        and {(gid, wrong) for gid, wrong, _ in KNOWN_CORRECTIONS} <= corrections
+    )
+
+
+def _seed(cur: sqlite3.Cursor) -> None:
+    """Insert any missing divisions and known name corrections."""
     # Seed division records
     for div_id, info in DIVISIONS.items():
         cur.execute("""
@@ -90,31 +256,220 @@ def init_db() -> None:
             VALUES (?, ?, ?, ?)
         """, (div_id, info["name"], info["type"], info["level"]))
 
-    # Seed known name corrections (game_id = RAMP external GID).
-    # These are applied at insert time so --full re-scrapes also pick them up.
-    KNOWN_CORRECTIONS = [
-        # game_id (RAMP external GID), wrong_name, correct_name
-        (1707872, "khaed issa",           "Khaled Issa"),
-        (1707883, "Abdul Rahman  Nasser", "Abdulrahman Nasser"),
-        (1666700, "Carlos Gonzales",      "Carlos Gonzalez"),
-        (1666930, "mahmoud issa",         "Mahmoud Issa"),
-        (1667045, "mahmoud issa",         "Mahmoud Issa"),
-        (1666882, "shan dhillon",         "Shan Dhillon"),
-        (1667057, "riley meloche",        "Riley Meloche"),
-        (1666995, "SHAM WELDEMICHEL",     "Sham Weldemichel"),
-        (1667101, "sham weldemichel",     "Sham Weldemichel"),
-        (1666848, "Adebo Falase",         "Adeoba Falase"),
-        (1707887, "Sulliman Akbari",      "Suleman Akbari"),
-    ]
+    # Seed known name corrections
     for gid, wrong, correct in KNOWN_CORRECTIONS:
         cur.execute("""
             INSERT OR IGNORE INTO name_corrections (game_id, wrong_name, correct_name)
             VALUES (?, ?, ?)
         """, (gid, wrong, correct))
 
-    conn.commit()
-    conn.close()
-    print(f"DB initialised at {get_db_path()}")
+
+# Row counts kept current by triggers so get_stats never scans the tables.
+# Each entry: counter name → SQL expression for its value from scratch.
+_COUNTERS = {
+    "games_total":           "SELECT COUNT(*) FROM games",
+    "games_scraped":         "SELECT COUNT(*) FROM games WHERE scraped_at IS NOT NULL",
+    "misconducts":           "SELECT COUNT(*) FROM misconduct_facts",
+    "yellows":               "SELECT COUNT(*) FROM misconduct_facts WHERE card_type = 'Yellow'",
+    "reds":                  "SELECT COUNT(*) FROM misconduct_facts WHERE card_type = 'Red'",
+    "suspensions_served":    "SELECT COUNT(*) FROM suspension_served_facts",
+    "printable_suspensions": "SELECT COUNT(*) FROM printable_suspension_facts",
+}
+
+# trigger name → (event, {counter: delta expression})
+_COUNTER_TRIGGERS = {
+    "games_ai": ("AFTER INSERT ON games", {
+        "games_total": "1",
+        "games_scraped": "NEW.scraped_at IS NOT NULL",
+    }),
+    "games_ad": ("AFTER DELETE ON games", {
+        "games_total": "-1",
+        "games_scraped": "-(OLD.scraped_at IS NOT NULL)",
+    }),
+    "games_au": ("AFTER UPDATE OF scraped_at ON games", {
+        "games_scraped": "(NEW.scraped_at IS NOT NULL) - (OLD.scraped_at IS NOT NULL)",
+    }),
+    "misconduct_facts_ai": ("AFTER INSERT ON misconduct_facts", {
+        "misconducts": "1",
+        "yellows": "NEW.card_type = 'Yellow'",
+        "reds": "NEW.card_type = 'Red'",
+    }),
+    "misconduct_facts_ad": ("AFTER DELETE ON misconduct_facts", {
+        "misconducts": "-1",
+        "yellows": "-(OLD.card_type = 'Yellow')",
+        "reds": "-(OLD.card_type = 'Red')",
+    }),
+    "misconduct_facts_au": ("AFTER UPDATE OF card_type ON misconduct_facts", {
+        "yellows": "(NEW.card_type = 'Yellow') - (OLD.card_type = 'Yellow')",
+        "reds": "(NEW.card_type = 'Red') - (OLD.card_type = 'Red')",
+    }),
+    "suspension_served_facts_ai": ("AFTER INSERT ON suspension_served_facts", {"suspensions_served": "1"}),
+    "suspension_served_facts_ad": ("AFTER DELETE ON suspension_served_facts", {"suspensions_served": "-1"}),
+    "printable_suspension_facts_ai": ("AFTER INSERT ON printable_suspension_facts", {"printable_suspensions": "1"}),
+    "printable_suspension_facts_ad": ("AFTER DELETE ON printable_suspension_facts", {"printable_suspensions": "-1"}),
+}
+
+
+def _init_counters(cur: sqlite3.Cursor) -> None:
+    """Create the counters table and its triggers, seeding it from the data."""
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_games_scraped_at ON games(scraped_at)")
+    for name, sql in _COUNTERS.items():
+        cur.execute(f"INSERT OR IGNORE INTO counters (name, value) VALUES (?, ({sql}))", (name,))
+    for trigger, (event, deltas) in _COUNTER_TRIGGERS.items():
+        cases = " ".join(f"WHEN '{k}' THEN ({v})" for k, v in deltas.items())
+        names = ", ".join(f"'{k}'" for k in deltas)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS counters_{trigger} {event}
+            BEGIN
+                UPDATE counters SET value = value + CASE name {cases} END
+                WHERE name IN ({names});
+            END
+        """)
+
+
+def _migrate(cur: sqlite3.Cursor) -> None:
+    """
+    Bring a DB created by an older scraper up to the current schema.
+
+    Runs as one explicit transaction — ALTER TABLE would otherwise commit on
+    its own, and an interrupted run would leave a new column without its
+    backfill.  Backfills only touch NULLs, so every pass also repairs a DB
+    left half-migrated by an older scraper.
+    """
+    cur.execute("BEGIN")
+    columns = {r[1] for r in cur.execute("PRAGMA table_info(games)")}
+    if "game_day" not in columns:
+        cur.execute("ALTER TABLE games ADD COLUMN game_day TEXT")
+    rows = cur.execute("""
+        SELECT id, game_date FROM games
+        WHERE (game_day IS NULL AND game_date IS NOT NULL) OR game_date LIKE '/Date(%'
+    """).fetchall()
+    cur.executemany(
+        "UPDATE games SET game_day = ? WHERE id = ?",
+        [(normalize_date(r[1]), r[0]) for r in rows],
+    )
+    if "season_id" not in columns:
+        # Filled in by the next scrape, which upserts every listed game.
+        cur.execute("ALTER TABLE games ADD COLUMN season_id INTEGER")
+    if "home_team_id" not in columns:
+        cur.execute("ALTER TABLE games ADD COLUMN home_team_id INTEGER REFERENCES teams(id)")
+        cur.execute("ALTER TABLE games ADD COLUMN away_team_id INTEGER REFERENCES teams(id)")
+    cur.execute("""
+        INSERT OR IGNORE INTO teams (name)
+        SELECT home_team FROM games WHERE home_team != '' AND home_team_id IS NULL
+        UNION SELECT away_team FROM games WHERE away_team != '' AND away_team_id IS NULL
+    """)
+    cur.execute("""
+        UPDATE games SET
+            home_team_id = COALESCE(home_team_id, (SELECT id FROM teams WHERE name = games.home_team)),
+            away_team_id = COALESCE(away_team_id, (SELECT id FROM teams WHERE name = games.away_team))
+        WHERE home_team_id IS NULL OR away_team_id IS NULL
+    """)
+
+    # Text-keyed fact tables from before interning: move rows into the
+    # *_facts tables, then drop them so the compatibility views take over.
+    # The copy and the DROP commit together with the rest of the migration.
+    tables = {r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for legacy, facts in _FACT_TABLES.items():
+        if legacy not in tables:
+            continue
+        extra = ", player_number, minute, reason, card_type" if legacy == "misconducts" else ""
+        cur.execute(f"""
+            INSERT OR IGNORE INTO players (name)
+            SELECT DISTINCT player_name FROM {legacy} WHERE player_name IS NOT NULL
+        """)
+        cur.execute(f"""
+            INSERT OR IGNORE INTO teams (name)
+            SELECT DISTINCT team FROM {legacy} WHERE team != ''
+        """)
+        cur.execute(f"""
+            INSERT INTO {facts} (id, game_id, player_id, team_id{extra})
+            SELECT l.id, l.game_id, p.id, t.id{extra.replace(", ", ", l.")}
+            FROM {legacy} l
+            LEFT JOIN players p ON p.name = l.player_name
+            LEFT JOIN teams t   ON t.name = l.team
+        """)
+        cur.execute(f"DROP TABLE {legacy}")
+    cur.connection.commit()
+
+
+# Compatibility view name → integer-keyed fact table behind it.
+_FACT_TABLES = {
+    "misconducts":           "misconduct_facts",
+    "suspensions_served":    "suspension_served_facts",
+    "printable_suspensions": "printable_suspension_facts",
+}
+
+# In-process cache of interned names: (table, name) → id.  Rows in teams /
+# players are never deleted, but ids inserted by a transaction that is later
+# rolled back are — roll back through rollback() so the cache is dropped too.
+_intern_cache: dict[tuple[str, str], int] = {}
+
+
+def rollback(conn: sqlite3.Connection) -> None:
+    """Roll back conn, forgetting interned ids the transaction may have made."""
+    conn.rollback()
+    _intern_cache.clear()
+
+
+def intern_name(conn: sqlite3.Connection, table: str, name: str) -> int | None:
+    """Return the teams/players id for name, inserting it on first sight."""
+    if not name:
+        return None
+    key = (table, name)
+    pk = _intern_cache.get(key)
+    if pk is None:
+        conn.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+        pk = conn.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+        _intern_cache[key] = pk
+    return pk
+
+
+# Formats seen in RAMP sDate / sDateString, tried after ISO and /Date(ms)/.
+_DATE_FORMATS = (
+    "%m/%d/%Y %I:%M:%S %p",
+    "%m/%d/%Y %I:%M %p",
+    "%m/%d/%Y",
+    "%a, %b %d, %Y",
+    "%A, %B %d, %Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+)
+_ISO_DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})")
+# /Date(ms)/ or /Date(ms±hhmm)/: ms is a UTC instant; the optional suffix is
+# the sender's UTC offset.  Without one, the league's local time applies.
+_MS_DATE_RE = re.compile(r"^/Date\((-?\d+)(?:([+-])(\d{2})(\d{2}))?")
+_LOCAL_TZ = timezone(timedelta(hours=LOCAL_UTC_OFFSET))
+
+
+def normalize_date(value: str | None) -> str | None:
+    """Return a RAMP date string as YYYY-MM-DD, or None if unparseable."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    m = _ISO_DATE_RE.match(value)
+    if m:
+        return "-".join(m.groups())
+    m = _MS_DATE_RE.match(value)
+    if m:
+        ts = int(m.group(1)) / 1000
+        tz = _LOCAL_TZ
+        if m.group(2):
+            offset = timedelta(hours=int(m.group(3)), minutes=int(m.group(4)))
+            tz = timezone(offset if m.group(2) == "+" else -offset)
+        return datetime.fromtimestamp(ts, tz).date().isoformat()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
 
 
 def get_division_pk(conn: sqlite3.Connection, division_id: int) -> int | None:
@@ -140,39 +495,58 @@ def upsert_game(
     location: str,
     home_team: str,
     away_team: str,
+    season_id: int | None = None,
 ) -> int:
     """Insert or update a game row. Returns the games.id PK."""
     div_pk = get_division_pk(conn, division_id)
+    # New ids start above any archived game so the web's hot+archive
+    # views never see two games with the same PK.
     conn.execute("""
-        INSERT INTO games (game_id, division_id, game_number, game_date, location, home_team, away_team)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+        INSERT INTO games (id, game_id, division_id, season_id, game_number, game_date, game_day,
+                           location, home_team, away_team, home_team_id, away_team_id)
+        VALUES (
+            MAX(COALESCE((SELECT MAX(id) FROM games), 0),
+                COALESCE((SELECT MAX(max_game_pk) FROM archived_seasons), 0)) + 1,
+            ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?
+        )
         ON CONFLICT(game_id) DO UPDATE SET
             division_id   = excluded.division_id,
+            season_id     = COALESCE(excluded.season_id, season_id),
             game_number   = excluded.game_number,
             game_date     = excluded.game_date,
+            game_day      = excluded.game_day,
             location      = excluded.location,
             home_team     = excluded.home_team,
-            away_team     = excluded.away_team
-    """, (game_id, div_pk, game_number, game_date, location, home_team, away_team))
+            away_team     = excluded.away_team,
+            home_team_id  = excluded.home_team_id,
+            away_team_id  = excluded.away_team_id
+    """, (game_id, div_pk, season_id, game_number, game_date, normalize_date(game_date),
+          location, home_team, away_team,
+          intern_name(conn, "teams", home_team), intern_name(conn, "teams", away_team)))
     row = conn.execute("SELECT id FROM games WHERE game_id = ?", (game_id,)).fetchone()
     return row["id"]
 
 
 def mark_game_scraped(conn: sqlite3.Connection, game_id: int) -> None:
-    from datetime import datetime, timezone
     now = datetime.now(timezone.utc).isoformat()
     conn.execute(
         "UPDATE games SET scraped_at = ? WHERE game_id = ?", (now, game_id)
     )
 
 
+# All name corrections keyed by RAMP game_id, loaded once per process on
+# first use instead of querying per gamesheet.
+_corrections_cache: dict[int, dict[str, str]] | None = None
+
+
 def get_name_corrections(conn: sqlite3.Connection, ramp_game_id: int) -> dict:
     """Return {wrong_name: correct_name} for the given RAMP external game_id."""
-    rows = conn.execute(
-        "SELECT wrong_name, correct_name FROM name_corrections WHERE game_id = ?",
-        (ramp_game_id,),
-    ).fetchall()
-    return {r["wrong_name"]: r["correct_name"] for r in rows}
+    global _corrections_cache
+    if _corrections_cache is None:
+        _corrections_cache = {}
+        for r in conn.execute("SELECT game_id, wrong_name, correct_name FROM name_corrections"):
+            _corrections_cache.setdefault(r[0], {})[r[1]] = r[2]
+    return _corrections_cache.get(ramp_game_id, {})
 
 
 def insert_name_correction(
@@ -187,6 +561,61 @@ def insert_name_correction(
         VALUES (?, ?, ?)
     """, (ramp_game_id, wrong_name, correct_name))
     conn.commit()
+    if _corrections_cache is not None:
+        _corrections_cache.setdefault(ramp_game_id, {}).setdefault(wrong_name, correct_name)
+
+
+def apply_name_corrections(conn: sqlite3.Connection) -> dict:
+    """
+    Rewrite stored misconduct and suspension rows to the corrected names.
+
+    One set-based UPDATE per fact table, joined to name_corrections on the
+    RAMP game_id — no re-scrape needed.  Rows of archived seasons are
+    corrected in the archive DB too, so a player's seasons keep one name.
+    Returns rows changed per table.
+    """
+    conn.execute("""
+        INSERT OR IGNORE INTO players (name)
+        SELECT DISTINCT correct_name FROM name_corrections
+    """)
+    counts = {}
+    for view, facts in _FACT_TABLES.items():
+        counts[view] = conn.execute(f"""
+            UPDATE {facts} AS f SET player_id = pc.id
+            FROM name_corrections nc
+            JOIN games g    ON g.game_id = nc.game_id
+            JOIN players pw ON pw.name = nc.wrong_name
+            JOIN players pc ON pc.name = nc.correct_name
+            WHERE f.game_id = g.id
+              AND f.player_id = pw.id
+        """).rowcount
+    conn.commit()
+
+    path = get_archive_path()
+    if not os.path.exists(path):
+        return counts
+    os.chmod(path, 0o644)
+    conn.execute("ATTACH DATABASE ? AS archive", (path,))
+    try:
+        # Archive tables keep the view shape, names included.
+        for view in _FACT_TABLES:
+            counts[f"{view} (archive)"] = conn.execute(f"""
+                UPDATE archive.{view} AS f
+                SET player_name = nc.correct_name, player_id = pc.id
+                FROM name_corrections nc
+                JOIN archive.games g ON g.game_id = nc.game_id
+                JOIN players pc      ON pc.name = nc.correct_name
+                WHERE f.game_id = g.id
+                  AND f.player_name = nc.wrong_name
+            """).rowcount
+        conn.commit()
+    except Exception:
+        rollback(conn)
+        raise
+    finally:
+        conn.execute("DETACH DATABASE archive")
+        os.chmod(path, 0o444)
+    return counts
 
 
 def insert_misconduct(
@@ -203,63 +632,292 @@ def insert_misconduct(
     if corrections:
         player_name = corrections.get(player_name, player_name)
     conn.execute("""
-        INSERT INTO misconducts (game_id, player_name, player_number, team, minute, reason, card_type)
+        INSERT INTO misconduct_facts (game_id, player_id, player_number, team_id, minute, reason, card_type)
         VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (game_pk, player_name, player_number, team, minute, reason, card_type))
+    """, (game_pk, intern_name(conn, "players", player_name), player_number,
+          intern_name(conn, "teams", team), minute, reason, card_type))
 
 
 def insert_suspension_served(
-    conn: sqlite3.Connection, game_pk: int, player_name: str, team: str
+    conn: sqlite3.Connection,
+    game_pk: int,
+    player_name: str,
+    team: str,
+    corrections: dict | None = None,
 ) -> None:
+    if corrections:
+        player_name = corrections.get(player_name, player_name)
     conn.execute("""
-        INSERT INTO suspensions_served (game_id, player_name, team)
+        INSERT INTO suspension_served_facts (game_id, player_id, team_id)
         VALUES (?, ?, ?)
-    """, (game_pk, player_name, team))
+    """, (game_pk, intern_name(conn, "players", player_name), intern_name(conn, "teams", team)))
 
 
 def insert_printable_suspension(
     conn: sqlite3.Connection, game_pk: int, player_name: str, team: str
 ) -> None:
     conn.execute("""
-        INSERT INTO printable_suspensions (game_id, player_name, team)
+        INSERT INTO printable_suspension_facts (game_id, player_id, team_id)
         VALUES (?, ?, ?)
-    """, (game_pk, player_name, team))
+    """, (game_pk, intern_name(conn, "players", player_name), intern_name(conn, "teams", team)))
 
 
 def delete_game_data(conn: sqlite3.Connection, game_pk: int) -> None:
     """Remove all child rows before re-scraping a game."""
-    for table in ("misconducts", "suspensions_served", "printable_suspensions"):
+    for table in _FACT_TABLES.values():
         conn.execute(f"DELETE FROM {table} WHERE game_id = ?", (game_pk,))
     conn.execute("UPDATE games SET scraped_at = NULL WHERE id = ?", (game_pk,))
 
 
 def clear_suspension_data(conn: sqlite3.Connection, game_pk: int) -> None:
     """Remove only suspension rows for a game, leaving misconducts intact."""
-    conn.execute("DELETE FROM suspensions_served WHERE game_id = ?", (game_pk,))
+    conn.execute("DELETE FROM suspension_served_facts WHERE game_id = ?", (game_pk,))
     conn.execute("UPDATE games SET scraped_at = NULL WHERE id = ?", (game_pk,))
 
 
 def get_stats(conn: sqlite3.Connection) -> dict:
+    """DB summary from the trigger-maintained counters — no table scans."""
+    counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
     stats = {}
     stats["divisions"] = conn.execute("SELECT COUNT(*) FROM divisions").fetchone()[0]
-    stats["games_total"] = conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
-    stats["games_scraped"] = conn.execute(
-        "SELECT COUNT(*) FROM games WHERE scraped_at IS NOT NULL"
-    ).fetchone()[0]
-    stats["misconducts"] = conn.execute("SELECT COUNT(*) FROM misconducts").fetchone()[0]
-    stats["yellows"] = conn.execute(
-        "SELECT COUNT(*) FROM misconducts WHERE card_type = 'Yellow'"
-    ).fetchone()[0]
-    stats["reds"] = conn.execute(
-        "SELECT COUNT(*) FROM misconducts WHERE card_type = 'Red'"
-    ).fetchone()[0]
-    stats["suspensions_served"] = conn.execute(
-        "SELECT COUNT(*) FROM suspensions_served"
-    ).fetchone()[0]
-    stats["printable_suspensions"] = conn.execute(
-        "SELECT COUNT(*) FROM printable_suspensions"
-    ).fetchone()[0]
+    for name in _COUNTERS:
+        stats[name] = counters.get(name, 0)
+    # Served by idx_games_scraped_at.
     stats["last_scraped"] = conn.execute(
         "SELECT MAX(scraped_at) FROM games"
     ).fetchone()[0]
     return stats
+
+
+def publish_snapshot(conn: sqlite3.Connection) -> str:
+    """
+    Publish a consistent read-only copy of the DB for the web tier.
+
+    The snapshot is taken with the SQLite online backup API, so it reflects a
+    single committed state even while the scraper is mid-run.  It is built
+    under a temporary name, switched out of WAL mode, analyzed and vacuumed,
+    then swapped in with an atomic rename — PHP readers either see the old
+    snapshot or the new one, never a half-written file.
+    Returns the published path.
+    """
+    path = get_snapshot_path()
+    tmp_path = path + ".tmp"
+    # The backup copies the live DB's WAL-mode header, so a run that died
+    # before switching the copy to DELETE mode can leave -wal / -shm behind.
+    for stale in (tmp_path, tmp_path + "-journal", tmp_path + "-wal", tmp_path + "-shm"):
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    conn.commit()
+    snap = sqlite3.connect(tmp_path)
+    try:
+        conn.backup(snap)
+        snap.execute("PRAGMA journal_mode = DELETE")
+        snap.execute("ANALYZE")
+        snap.commit()
+        snap.execute("VACUUM")
+    finally:
+        snap.close()
+
+    os.replace(tmp_path, path)
+    return path
+
+
+def get_storage_info(conn: sqlite3.Connection) -> dict:
+    """Return page/freelist counts and on-disk sizes for the DB and its WAL."""
+    path = get_db_path()
+    wal_path = path + "-wal"
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    return {
+        "page_size":     page_size,
+        "page_count":    page_count,
+        "freelist":      freelist,
+        "fragmentation": round(100.0 * freelist / page_count, 1) if page_count else 0.0,
+        "db_bytes":      os.path.getsize(path) if os.path.exists(path) else 0,
+        "wal_bytes":     os.path.getsize(wal_path) if os.path.exists(wal_path) else 0,
+    }
+
+
+def maintain(conn: sqlite3.Connection) -> tuple[dict, dict]:
+    """
+    Checkpoint the WAL, refresh planner statistics and reclaim free pages.
+
+    The first run on an older DB switches it to auto_vacuum=INCREMENTAL,
+    which needs one full VACUUM; later runs only release the freelist.
+    Returns (before, after) storage info.
+    """
+    conn.commit()
+    before = get_storage_info(conn)
+
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("PRAGMA analysis_limit = 1000")
+    conn.execute("PRAGMA optimize")
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone():
+        conn.execute("ANALYZE")
+    conn.commit()
+
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    else:
+        conn.execute("PRAGMA incremental_vacuum")
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    return before, get_storage_info(conn)
+
+
+# Tables (or compatibility views) moved by archive_season, children first
+# for deletion order.  The archive keeps the denormalised view shape.
+_ARCHIVE_TABLES = ("misconducts", "suspensions_served", "printable_suspensions", "games")
+_ARCHIVE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS archive.idx_games_game_id ON games(game_id)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_games_season ON games(season_id)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_misconducts_game ON misconducts(game_id)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_misconducts_player ON misconducts(player_name)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_served_game ON suspensions_served(game_id)",
+    "CREATE INDEX IF NOT EXISTS archive.idx_printable_game ON printable_suspensions(game_id)",
+)
+
+
+def _columns(conn: sqlite3.Connection, table: str, schema: str = "main") -> list[str]:
+    return [r[1] for r in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def get_archived_seasons(conn: sqlite3.Connection) -> set[int]:
+    return {r[0] for r in conn.execute("SELECT season_id FROM archived_seasons")}
+
+
+def archive_season(conn: sqlite3.Connection, season_id: int) -> dict:
+    """
+    Move a finished season's games and child rows into the archive DB.
+
+    The main DB runs in WAL mode, where a transaction spanning attached
+    databases is not atomic, so this goes in two steps: copy the rows into
+    the archive and commit, check the archive holds them all, then record
+    the season in archived_seasons and delete the hot rows in one main-DB
+    transaction.  Archived rows are only visible to readers once
+    archived_seasons lists their season (see attach_archive), so an
+    interrupted run leaves the season in the hot tables and a re-run
+    replaces the partial copy.  The archive is then analyzed, vacuumed and
+    left read-only on disk.  Returns row counts per table.  Raises
+    ValueError if the season is unknown, already archived or still has
+    games today or later.
+    """
+    if season_id in get_archived_seasons(conn):
+        raise ValueError(f"Season {season_id} is already archived.")
+    games, max_pk, open_games = conn.execute("""
+        SELECT COUNT(*), MAX(id), SUM(game_day IS NULL OR game_day >= date('now'))
+        FROM games WHERE season_id = ?
+    """, (season_id,)).fetchone()
+    if not games:
+        raise ValueError(f"No games recorded for season {season_id} — run a scrape first.")
+    if open_games:
+        raise ValueError(f"Season {season_id} still has {open_games} game(s) not yet played.")
+
+    path = get_archive_path()
+    if os.path.exists(path):
+        os.chmod(path, 0o644)
+
+    conn.commit()
+    conn.execute("ATTACH DATABASE ? AS archive", (path,))
+    counts = {}
+    season = {"season": season_id}
+    hot_games = "SELECT id FROM main.games WHERE season_id = :season"
+    archived_games = "SELECT id FROM archive.games WHERE season_id = :season"
+    try:
+        # Step 1: copy into the archive, replacing any partial earlier copy.
+        for table in _ARCHIVE_TABLES:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS archive.{table} AS SELECT * FROM main.{table} WHERE 0"
+            )
+            archived = _columns(conn, table, "archive")
+            for col in _columns(conn, table):
+                if col not in archived:
+                    conn.execute(f"ALTER TABLE archive.{table} ADD COLUMN {col}")
+        for sql in _ARCHIVE_INDEXES:
+            conn.execute(sql)
+        for table in _ARCHIVE_TABLES:
+            key = "id" if table == "games" else "game_id"
+            conn.execute(f"DELETE FROM archive.{table} WHERE {key} IN ({archived_games})", season)
+        for table in _ARCHIVE_TABLES:
+            cols = ", ".join(_columns(conn, table))
+            key = "id" if table == "games" else "game_id"
+            counts[table] = conn.execute(f"""
+                INSERT INTO archive.{table} ({cols})
+                SELECT {cols} FROM main.{table} WHERE {key} IN ({hot_games})
+            """, season).rowcount
+        conn.commit()
+
+        for table in _ARCHIVE_TABLES:
+            key = "id" if table == "games" else "game_id"
+            copied = conn.execute(
+                f"SELECT COUNT(*) FROM archive.{table} WHERE {key} IN ({archived_games})", season
+            ).fetchone()[0]
+            if copied != counts[table]:
+                raise RuntimeError(
+                    f"Archive copy of {table} has {copied} rows, expected {counts[table]}; "
+                    f"season {season_id} left in the live DB."
+                )
+
+        # Step 2: hand the season over to the archive in the main DB.
+        conn.execute("""
+            INSERT INTO archived_seasons (season_id, archived_at, games, max_game_pk)
+            VALUES (?, ?, ?, ?)
+        """, (season_id, datetime.now(timezone.utc).isoformat(), games, max_pk))
+        for table in _ARCHIVE_TABLES:
+            key = "id" if table == "games" else "game_id"
+            conn.execute(
+                f"DELETE FROM main.{_FACT_TABLES.get(table, table)} WHERE {key} IN ({hot_games})",
+                season,
+            )
+        conn.commit()
+    except Exception:
+        rollback(conn)
+        raise
+    finally:
+        conn.execute("DETACH DATABASE archive")
+
+    archive = sqlite3.connect(path)
+    try:
+        archive.execute("ANALYZE")
+        archive.commit()
+        archive.execute("VACUUM")
+    finally:
+        archive.close()
+    os.chmod(path, 0o444)
+    return counts
+
+
+def attach_archive(conn: sqlite3.Connection) -> bool:
+    """
+    Attach the archive DB and shadow the fact tables with TEMP views over
+    hot + archived rows, so existing queries see every season unchanged.
+    Archived rows only show for seasons this DB's own archived_seasons
+    lists, so a snapshot published before a season was archived (and still
+    holding it) never counts it twice.  Only for read connections — the
+    views cannot be written through.  Returns False if there is no archive
+    yet.
+    """
+    path = get_archive_path()
+    if not os.path.exists(path) or not conn.execute(
+        "SELECT 1 FROM main.sqlite_master WHERE name = 'archived_seasons'"
+    ).fetchone():
+        return False
+    conn.execute("ATTACH DATABASE ? AS archive", (path,))
+    seasons = "SELECT season_id FROM main.archived_seasons"
+    for table in _ARCHIVE_TABLES:
+        cols = _columns(conn, table)
+        archived = set(_columns(conn, table, "archive"))
+        archive_cols = [c if c in archived else f"NULL AS {c}" for c in cols]
+        visible = f"season_id IN ({seasons})" if table == "games" else \
+            f"game_id IN (SELECT id FROM archive.games WHERE season_id IN ({seasons}))"
+        conn.execute(f"""
+            CREATE TEMP VIEW IF NOT EXISTS {table} AS
+            SELECT {", ".join(cols)} FROM main.{table}
+            UNION ALL
+            SELECT {", ".join(archive_cols)} FROM archive.{table} WHERE {visible}
+        """)
+    return True
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Load test: in-memory read server (serve.py) vs. direct SQLite queries.
+
+The SQLite side runs the same queries web/api.php does, opening a fresh
+connection per request as PHP does, so the numbers compare what a page
+load costs today with what it costs from the in-memory model.
+
+Usage:
+    python serve.py &                    # in another shell
+    python loadtest.py                   # 200 requests per action, 8 connections
+    python loadtest.py --requests 1000 --concurrency 32 --check
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import statistics
+import time
+from urllib.parse import urlencode, urlsplit
+
+import rules
+import serve
+
+# (label, query params) — each is run against both backends.
+SCENARIOS = [
+    ("players",             {"action": "players"}),
+    ("players mens",        {"action": "players", "div_type": "mens"}),
+    ("players per_div",     {"action": "players", "mode": "per_division"}),
+    ("stats",               {"action": "stats"}),
+    ("teams",               {"action": "teams"}),
+    ("discrepancies",       {"action": "discrepancies"}),
+]
+
+
+# ---------------------------------------------------------------------------
+# Direct SQLite — ports of the api.php handlers
+# ---------------------------------------------------------------------------
+
+_NOT_EJECTION = """
+    NOT EXISTS (
+        SELECT 1 FROM misconducts m2
+        WHERE m2.game_id = m.game_id
+          AND m2.player_id = m.player_id
+          AND m2.card_type = 'Red'
+    )
+"""
+
+
+def _compliance(conn: sqlite3.Connection, name: str) -> dict:
+    """get_compliance_report(): three queries per player, as in rules.php."""
+    yellows = conn.execute(f"""
+        SELECT m.*, g.game_date FROM misconducts m
+        JOIN games g ON m.game_id = g.id
+        JOIN divisions d ON g.division_id = d.id
+        WHERE m.player_name = ? AND m.card_type = 'Yellow' AND {_NOT_EJECTION}
+        ORDER BY g.game_date ASC
+    """, (name,)).fetchall()
+    reds = conn.execute("""
+        SELECT m.*, g.game_date FROM misconducts m
+        JOIN games g ON m.game_id = g.id
+        JOIN divisions d ON g.division_id = d.id
+        WHERE m.player_name = ? AND m.card_type = 'Red'
+        ORDER BY g.game_date ASC
+    """, (name,)).fetchall()
+    served = conn.execute("""
+        SELECT ss.*, g.game_date FROM suspensions_served ss
+        JOIN games g ON ss.game_id = g.id
+        JOIN divisions d ON g.division_id = d.id
+        WHERE ss.player_name = ?
+        ORDER BY g.game_date ASC
+    """, (name,)).fetchall()
+    expected = rules.expected_yellow_suspensions(len(yellows)) + len(reds)
+    unserved = max(0, expected - len(served))
+    return {
+        "expected_count": expected,
+        "served_count":   len(served),
+        "unserved_count": unserved,
+        "fully_compliant": unserved == 0,
+    }
+
+
+def direct_players(conn: sqlite3.Connection, params: dict) -> dict:
+    div_type = params.get("div_type", "all")
+    per_division = params.get("mode", "combined") == "per_division"
+    where, args = ["m.player_name != 'Bench Penalty'"], {}
+    if div_type != "all":
+        where.append("d.type = :div_type")
+        args["div_type"] = div_type
+    select_extra = "d.name AS division_name" if per_division \
+        else "GROUP_CONCAT(DISTINCT d.name) AS division_names"
+    group_by = "m.player_id, d.id" if per_division else "m.player_id"
+    rows = conn.execute(f"""
+        SELECT m.player_name,
+               GROUP_CONCAT(DISTINCT m.team) AS teams,
+               {select_extra},
+               SUM(CASE WHEN m.card_type = 'Yellow' AND {_NOT_EJECTION} THEN 1 ELSE 0 END) AS yellow_count,
+               SUM(CASE WHEN m.card_type = 'Red' THEN 1 ELSE 0 END) AS red_count,
+               SUM({rules.weight_sql()}) AS danger_weight
+        FROM misconducts m
+        JOIN games g     ON m.game_id = g.id
+        JOIN divisions d ON g.division_id = d.id
+        WHERE {' AND '.join(where)}
+        GROUP BY {group_by}
+        ORDER BY yellow_count DESC, red_count DESC, m.player_name ASC
+    """, args).fetchall()
+
+    players = []
+    for row in rows:
+        yellows, reds = row["yellow_count"], row["red_count"]
+        status = rules.yellow_status(yellows)
+        served_label, served_class = "—", "text-gray-400"
+        if yellows >= 3 or reds > 0:
+            rpt = _compliance(conn, row["player_name"])
+            if rpt["expected_count"] and rpt["fully_compliant"]:
+                served_label, served_class = "✓ Served", "text-green-700 font-medium"
+            elif rpt["expected_count"]:
+                served_label = f"{rpt['unserved_count']} unserved"
+                served_class = "text-red-600 font-semibold"
+        divisions = [row["division_name"]] if per_division \
+            else serve._split_concat([row["division_names"]])
+        players.append({
+            "name":           row["player_name"],
+            "teams":          serve._split_concat([row["teams"]]),
+            "divisions":      divisions,
+            "yellow_count":   yellows,
+            "red_count":      reds,
+            "danger_score":   serve._php_round(row["danger_weight"] or 0.0, 1),
+            "status_class":   status["class"],
+            "status_label":   status["label"],
+            "next_threshold": rules.yellows_until_next(yellows),
+            "served_label":   served_label,
+            "served_class":   served_class,
+        })
+
+    game_where = ["g.scraped_at IS NOT NULL"] + (["d.type = :div_type"] if div_type != "all" else [])
+    total_games = conn.execute(f"""
+        SELECT COUNT(*) FROM games g JOIN divisions d ON g.division_id = d.id
+        WHERE {' AND '.join(game_where)}
+    """, args).fetchone()[0]
+    return {
+        "players": players,
+        "stats": {
+            "total_yellows":  sum(p["yellow_count"] for p in players),
+            "total_reds":     sum(p["red_count"] for p in players),
+            "suspension_due": sum(1 for p in players if p["status_class"] == "status-red"),
+            "total_games":    total_games,
+            "total_divs":     len({d for p in players for d in p["divisions"]}),
+            "total_teams":    len({t for p in players for t in p["teams"]}),
+        },
+    }
+
+
+def direct_stats(conn: sqlite3.Connection, params: dict) -> dict:
+    totals = conn.execute("""
+        SELECT SUM(CASE WHEN card_type = 'Yellow' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN card_type = 'Red'    THEN 1 ELSE 0 END)
+        FROM misconducts
+    """).fetchone()
+    players = conn.execute(f"""
+        SELECT SUM(CASE WHEN m.card_type = 'Yellow' AND {_NOT_EJECTION} THEN 1 ELSE 0 END) AS yc,
+               SUM(CASE WHEN m.card_type = 'Red' THEN 1 ELSE 0 END) AS rc
+        FROM misconducts m
+        GROUP BY m.player_id
+    """).fetchall()
+    last = conn.execute("SELECT MAX(scraped_at) FROM games").fetchone()[0]
+    return {
+        "total_yellows":        totals[0] or 0,
+        "total_reds":           totals[1] or 0,
+        "suspension_due_count": sum(
+            1 for p in players
+            if rules.yellow_status(p["yc"])["class"] == "status-red" or p["rc"] > 0
+        ),
+        "last_scraped":         last or None,
+    }
+
+
+def direct_teams(conn: sqlite3.Connection, params: dict) -> list[dict]:
+    rows = conn.execute(f"""
+        SELECT m.team, d.name AS division,
+               SUM(CASE WHEN m.card_type='Yellow' AND m.player_name != 'Bench Penalty' THEN 1 ELSE 0 END) AS yellows,
+               SUM(CASE WHEN m.card_type='Red'    AND m.player_name != 'Bench Penalty' THEN 1 ELSE 0 END) AS reds,
+               SUM(CASE WHEN m.card_type='Yellow' AND m.player_name  = 'Bench Penalty' THEN 1 ELSE 0 END) AS bench_yellows,
+               SUM(CASE WHEN m.card_type='Red'    AND m.player_name  = 'Bench Penalty' THEN 1 ELSE 0 END) AS bench_reds,
+               COUNT(*) AS total_cards,
+               COUNT(DISTINCT CASE WHEN m.player_name != 'Bench Penalty' THEN m.player_id END) AS unique_players,
+               SUM({rules.weight_sql()}) AS discipline_weight,
+               (SELECT COUNT(*) FROM games g2
+                WHERE (g2.home_team_id = m.team_id OR g2.away_team_id = m.team_id)
+                  AND g2.division_id = d.id) AS games_played
+        FROM misconducts m
+        JOIN games g     ON m.game_id = g.id
+        JOIN divisions d ON g.division_id = d.id
+        GROUP BY m.team_id, d.id
+    """).fetchall()
+    result = []
+    for row in rows:
+        gp = max(row["games_played"], 1)
+        result.append({
+            **{k: row[k] for k in ("team", "division", "yellows", "reds", "bench_yellows",
+                                   "bench_reds", "total_cards", "unique_players", "games_played")},
+            "discipline_score": serve._php_round(row["discipline_weight"] / gp, 2),
+        })
+    result.sort(key=lambda r: -r["discipline_score"])
+    return result
+
+
+def direct_discrepancies(conn: sqlite3.Connection, params: dict) -> list[dict]:
+    rows = conn.execute(f"""
+        SELECT m.player_name,
+               GROUP_CONCAT(DISTINCT m.team) AS teams,
+               GROUP_CONCAT(DISTINCT d.name) AS divisions,
+               SUM(CASE WHEN m.card_type = 'Yellow' AND {_NOT_EJECTION} THEN 1 ELSE 0 END) AS yc,
+               SUM(CASE WHEN m.card_type = 'Red' THEN 1 ELSE 0 END) AS rc
+        FROM misconducts m
+        JOIN games g     ON m.game_id = g.id
+        JOIN divisions d ON g.division_id = d.id
+        GROUP BY m.player_id
+        HAVING yc >= 3 OR rc >= 1
+        ORDER BY yc DESC
+    """).fetchall()
+    result = []
+    for row in rows:
+        rpt = _compliance(conn, row["player_name"])
+        if rpt["unserved_count"] <= 0:
+            continue
+        result.append({
+            "name":           row["player_name"],
+            "expected_count": rpt["expected_count"],
+            "served_count":   rpt["served_count"],
+            "unserved_count": rpt["unserved_count"],
+            "teams":          serve._split_concat([row["teams"]]),
+            "divisions":      serve._split_concat([row["divisions"]]),
+        })
+    result.sort(key=lambda r: -r["unserved_count"])
+    return result
+
+
+DIRECT = {
+    "players":       direct_players,
+    "stats":         direct_stats,
+    "teams":         direct_teams,
+    "discrepancies": direct_discrepancies,
+}
+
+
+def run_direct(params: dict) -> object:
+    """One api.php-style request: fresh connection, archive attached, queries."""
+    conn = serve.Model()._connect()
+    try:
+        return DIRECT[params["action"]](conn, params)
+    finally:
+        conn.close()
+
+
+# ---------------------------------------------------------------------------
+# HTTP client
+# ---------------------------------------------------------------------------
+
+async def _http_worker(host: str, port: int, target: str, count: int,
+                       latencies: list[float]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode()
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            writer.write(request)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = next(
+                int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                if line.lower().startswith(b"content-length:")
+            )
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def bench_server(url: str, params: dict, requests: int, concurrency: int) -> tuple:
+    parts = urlsplit(url)
+    target = f"{parts.path or '/'}?{urlencode(params)}"
+    latencies: list[float] = []
+    per_worker = max(1, requests // concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _http_worker(parts.hostname, parts.port or 80, target, per_worker, latencies)
+        for _ in range(concurrency)
+    ))
+    return latencies, time.perf_counter() - start
+
+
+def bench_direct(params: dict, requests: int) -> tuple:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        t = time.perf_counter()
+        run_direct(params)
+        latencies.append(time.perf_counter() - t)
+    return latencies, time.perf_counter() - start
+
+
+def _summary(latencies: list[float], elapsed: float) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (f"p50 {statistics.median(ordered) * 1000:8.2f} ms  "
+            f"p95 {p95 * 1000:8.2f} ms  {len(ordered) / elapsed:9.1f} req/s")
+
+
+async def fetch_json(url: str, params: dict) -> object:
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    writer.write(f"GET {parts.path or '/'}?{urlencode(params)} HTTP/1.1\r\n"
+                 f"Host: {parts.hostname}\r\nConnection: close\r\n\r\n".encode())
+    data = await reader.read()
+    writer.close()
+    return json.loads(data.split(b"\r\n\r\n", 1)[1])
+
+
+# Sort key of each action's rows, as api.php orders them.  Rows tied on it
+# come back in an unspecified order (SQLite's or PHP's sort), so --check only
+# lets tied rows differ in order.
+ROW_ORDER = {
+    "players":       lambda p: (-p["yellow_count"], -p["red_count"], p["name"]),
+    "teams":         lambda r: -r["discipline_score"],
+    "discrepancies": lambda r: -r["unserved_count"],
+}
+
+
+def _tied_runs(rows: list, key) -> list[tuple]:
+    """(sort key, rows as a multiset) for each run of consecutive tied rows."""
+    runs: list[tuple] = []
+    for row in rows:
+        k = key(row)
+        if not runs or runs[-1][0] != k:
+            runs.append((k, []))
+        runs[-1][1].append(json.dumps(row, sort_keys=True))
+    return [(k, sorted(r)) for k, r in runs]
+
+
+def _same(action: str, expected: object, actual: object) -> bool:
+    """Equal output with rows in the same order, up to reordering of rows
+    tied on the action's sort key."""
+    if expected == actual:
+        return True
+    key = ROW_ORDER.get(action)
+    if key is None:
+        return False
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        rows = "players"
+        if expected.keys() != actual.keys() or \
+                {k: v for k, v in expected.items() if k != rows} != \
+                {k: v for k, v in actual.items() if k != rows}:
+            return False
+        expected, actual = expected.get(rows), actual.get(rows)
+    if not isinstance(expected, list) or not isinstance(actual, list):
+        return False
+    return _tied_runs(expected, key) == _tied_runs(actual, key)
+
+
+async def main_async(args) -> None:
+    print(f"{'scenario':18s}  {'backend':7s}  latency / throughput")
+    mismatches = 0
+    for label, params in SCENARIOS:
+        if args.check:
+            expected = json.loads(json.dumps(run_direct(params)))
+            if not _same(params["action"], expected, await fetch_json(args.url, params)):
+                print(f"{label:18s}  MISMATCH between server and direct SQLite output")
+                mismatches += 1
+        lat, elapsed = await bench_server(args.url, params, args.requests, args.concurrency)
+        print(f"{label:18s}  {'server':7s}  {_summary(lat, elapsed)}")
+        lat, elapsed = bench_direct(params, args.direct_requests or args.requests)
+        print(f"{label:18s}  {'sqlite':7s}  {_summary(lat, elapsed)}")
+    if args.check:
+        print(f"\nOutput check: {'OK' if not mismatches else f'{mismatches} mismatch(es)'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test serve.py against direct SQLite queries")
+    parser.add_argument("--url", default="http://127.0.0.1:8765/api.php")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent server connections")
+    parser.add_argument(
+        "--direct-requests", type=int, metavar="N",
+        help="Requests per scenario on the SQLite side (default: --requests)",
+    )
+    parser.add_argument(
+        "--check", action="store_true",
+        help="Also verify the server returns the same JSON as the direct queries",
+    )
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Correctness and timing check for the misconduct-row parser in scrape.py.
+
+Runs a corpus of gamesheet rows through _parse_misconduct_line() and checks:
+  * valid rows parse exactly as the pre-linear regex parser did;
+  * rows the old regex mis-split (a name containing "for ") parse correctly
+    when the row's text nodes are kept apart, and exactly as before when
+    they are not.  Whether RAMP really splits the fields into separate text
+    nodes is unconfirmed; --gamesheet on a saved page reports it;
+  * malformed rows are rejected, and adversarial rows of up to --size chars
+    stay within a linear time budget.
+
+Each corpus row is given as its text nodes.  Every row is checked twice: as
+get_text(_NODE_SEP, strip=True) sees it, and flattened into a single node, so
+the parser is covered whether or not RAMP splits the cell into elements.
+
+Usage:
+    python parsecheck.py                       # corpus + timing, exit 1 on failure
+    python parsecheck.py --size 1000000        # longer adversarial rows
+    python parsecheck.py --legacy              # also time the old regex (slow)
+    python parsecheck.py --gamesheet page.html # check a saved RAMP gamesheet (needs bs4)
+"""
+
+import argparse
+import re
+import sys
+import time
+from html.parser import HTMLParser
+from typing import Optional
+
+from scrape import _NODE_SEP, _parse_misconduct_line
+
+# The parser scrape.py used before the linear rewrite, kept as the reference.
+_LEGACY_RE = re.compile(
+    r"^(.+?)at\s+(\d{1,2}:\d{2})\s+-\s*(?:#(\d+)\s+)?(.+?)for\s+(.+?)\s+\[(Yellow|Red)\]$",
+    re.IGNORECASE,
+)
+
+
+def legacy_parse(text: str) -> Optional[dict]:
+    m = _LEGACY_RE.match(text)
+    if not m:
+        return None
+    return {
+        "team":          m.group(1).strip(),
+        "minute":        m.group(2).strip(),
+        "player_number": m.group(3).strip() if m.group(3) else "",
+        "player_name":   re.sub(r'\s*\(AP\)\s*', '', m.group(4)).strip(),
+        "reason":        m.group(5).strip(),
+        "card_type":     m.group(6).capitalize(),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------------
+
+# Misconduct table as served by RAMP, rebuilt around the sample row quoted in
+# parse_misconduct_table()'s docstring.  Replace with a saved page
+# (--gamesheet) when checking against a live season.
+GAMESHEET_FIXTURE = """
+<table class="table">
+  <tr><th>Time of Misconducts</th></tr>
+  <tr><td><span>Cozmos 2</span><span>at 00:00 -</span><span>#22 Mike Collins</span><span>for Unsporting Behavior [Yellow]</span></td></tr>
+  <tr><td><span>FC Regina</span><span>at 38:12 -</span><span>#7 Khaled Issa (AP)</span><span>for Dissent by word or action [Yellow]</span></td></tr>
+  <tr><td><span>Queen City United</span><span>at 41:50 -</span><span>Bench Penalty</span><span>for Unsporting Behavior [Yellow]</span></td></tr>
+</table>
+"""
+
+# Rows as text nodes.  All of these parse identically to the old regex.
+VALID_ROWS = [
+    ("Cozmos 2", "at 00:00 -", "#22 Mike Collins", "for Unsporting Behavior [Yellow]"),
+    ("FC Regina", "at 38:12 -", "#7 Khaled Issa (AP)", "for Dissent by word or action [Yellow]"),
+    ("Queen City United", "at 41:50 -", "Bench Penalty", "for Unsporting Behavior [Yellow]"),
+    ("Hat Trick at Large", "at 3:05 -", "#10 Abdulrahman Nasser", "for Serious Foul Play [Red]"),
+    ("Atletico Patsies", "at 12:00 -", "#4 Sham Weldemichel", "for Second caution for persistent infringement [Red]"),
+    ("Real Mandrid", "at 9:59 -", "#99 Riley Meloche", "for Persistent Infringement [yellow]"),
+    ("Inter Regina", "at 20:00 -", "#3 Shan (AP) Dhillon", "for Denying obvious goal scoring opportunity [RED]"),
+    ("Format FC", "at 1:01 -", "#12 Carlos Gonzalez", "for Spitting at an opponent [Red]"),
+    ("Sporting Club", "at 44:44 -", "Adeoba Falase", "for Unsporting Behavior - Simulation [Yellow]"),
+]
+
+# Rows whose names contain "for " — the old regex cut the name at the first
+# "for".  The node-aware parser splits on the node boundary, which only helps
+# if RAMP emits separate text nodes; flattened, the row still parses as the
+# old regex did (name cut short).
+NAME_WITH_FOR_ROWS = [
+    (("United FC", "at 17:30 -", "#5 Dale Telfor Mills", "for Dissent [Yellow]"),
+     {"team": "United FC", "minute": "17:30", "player_number": "5",
+      "player_name": "Dale Telfor Mills", "reason": "Dissent", "card_type": "Yellow"}),
+]
+
+# Rows both parsers reject.
+INVALID_ROWS = [
+    ("Cozmos 2", "at 00:00 -", "#22 Mike Collins", "for Unsporting Behavior [Green]"),
+    ("Cozmos 2", "#22 Mike Collins", "for Unsporting Behavior [Yellow]"),
+    ("Cozmos 2", "at 00:00 -", "#22 Mike Collins", "Unsporting Behavior [Yellow]"),
+    ("at 00:00 -", "#22 Mike Collins", "for Unsporting Behavior [Yellow]"),
+    ("Cozmos 2", "at 00:00 -", "#22 Mike Collins", "for Unsporting Behavior [Yellow] extra"),
+    ("No Misconducts",),
+]
+
+
+def adversarial_rows(size: int) -> dict[str, str]:
+    """Malformed rows of about size chars, mostly ones the old regex backtracked on."""
+    n = max(1, size // 12)
+    return {
+        "times, no card":      "Team" + "at 10:00 - x" * n,
+        "times, no for":       "Team" + "at 10:00 - x" * n + " [Yellow]",
+        "fors, no time":       "Team" + "x for y" * n + " [Yellow]",
+        "fors, bad card":      "Teamat 10:00 -" + " for x" * n + " [Yellow] ",
+        "node soup":           _NODE_SEP.join(["at 1:00 -", "x"] * n) + " [Red]",
+        "whitespace run":      "Team" + " " * (12 * n) + "at",
+    }
+
+
+# ---------------------------------------------------------------------------
+# Checks
+# ---------------------------------------------------------------------------
+
+def as_nodes(nodes) -> str:
+    """get_text(_NODE_SEP, strip=True) of a cell with these text nodes."""
+    return _NODE_SEP.join(n.strip() for n in nodes if n.strip())
+
+
+def as_flat(nodes) -> str:
+    """get_text(strip=True) of the same cell — what the old parser read."""
+    return "".join(n.strip() for n in nodes if n.strip())
+
+
+class _RowText(HTMLParser):
+    """Text nodes of each <tr>, as bs4's get_text(strip=True) would see them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.rows: list[list[str]] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self.rows.append([])
+
+    def handle_data(self, data):
+        if self.rows and data.strip():
+            self.rows[-1].append(data)
+
+
+def fixture_rows(html: str) -> list[list[str]]:
+    reader = _RowText()
+    reader.feed(html)
+    return reader.rows[1:]   # skip the header row
+
+
+def gamesheet_rows(path: str) -> list[list[str]]:
+    """Text nodes of each misconduct row in a saved gamesheet page."""
+    from bs4 import BeautifulSoup
+    with open(path, encoding="utf-8") as f:
+        soup = BeautifulSoup(f.read(), "lxml")
+    for table in soup.find_all("table"):
+        first_row = table.find("tr")
+        if first_row and "misconduct" in first_row.get_text(strip=True).lower():
+            return [
+                [s for s in row.stripped_strings]
+                for row in table.find_all("tr")[1:]
+                if "no misconduct" not in row.get_text(strip=True).lower()
+            ]
+    return []
+
+
+def check_corpus(rows: list, label: str) -> int:
+    failures = 0
+    for nodes in rows:
+        expected = legacy_parse(as_flat(nodes))
+        for shape, text in (("nodes", as_nodes(nodes)), ("flat", as_flat(nodes))):
+            got = _parse_misconduct_line(text)
+            if got != expected:
+                failures += 1
+                print(f"  FAIL {label} ({shape}): {as_flat(nodes)!r}\n"
+                      f"       expected {expected}\n       got      {got}")
+    print(f"{label:24s} {len(rows):3d} rows  {'ok' if not failures else f'{failures} failure(s)'}")
+    return failures
+
+
+def check_name_with_for() -> int:
+    failures = 0
+    for nodes, split_expected in NAME_WITH_FOR_ROWS:
+        flat_expected = legacy_parse(as_flat(nodes))
+        for shape, text, expected in (("nodes", as_nodes(nodes), split_expected),
+                                      ("flat", as_flat(nodes), flat_expected)):
+            got = _parse_misconduct_line(text)
+            if got != expected:
+                failures += 1
+                print(f"  FAIL name with 'for' ({shape}): {as_flat(nodes)!r}\n"
+                      f"       expected {expected}\n       got      {got}")
+    label = 'name with "for"'
+    print(f"{label:24s} {len(NAME_WITH_FOR_ROWS):3d} rows  "
+          f"{'ok' if not failures else f'{failures} failure(s)'}"
+          f"  (fixed only for rows split into text nodes)")
+    return failures
+
+
+def report_node_layout(rows: list, label: str) -> None:
+    """How many saved rows carry team / time / player / reason as separate
+    text nodes — the layout the "for "-in-name fix depends on."""
+    split = sum(1 for nodes in rows if len(nodes) >= 4)
+    print(f"{label}: {split} of {len(rows)} row(s) split into 4+ text nodes"
+          + ("" if split == len(rows) else
+             " — names containing \"for \" in the other rows are still cut short"))
+
+
+def _best_of(fn, text: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_timing(size: int, budget_ms: float, legacy: bool) -> int:
+    """Each adversarial row must parse within budget_ms per 100k chars, and
+    quadrupling its length must not cost more than ~8× (linear is 4×)."""
+    failures = 0
+    small, large = adversarial_rows(size // 4), adversarial_rows(size)
+    print(f"\nadversarial rows, {size:,} chars (budget {budget_ms:g} ms / 100k chars)")
+    for name, text in large.items():
+        if _parse_misconduct_line(text) is not None:
+            failures += 1
+            print(f"  FAIL {name}: parsed a malformed row")
+        t_large = _best_of(_parse_misconduct_line, text)
+        t_small = _best_of(_parse_misconduct_line, small[name])
+        limit = budget_ms / 1000 * max(1.0, len(text) / 100_000)
+        growth = t_large / max(t_small, 1e-5)
+        ok = t_large <= limit and growth <= 8
+        failures += not ok
+        line = f"  {name:18s} {t_large * 1000:8.2f} ms  ×{growth:4.1f} for 4× length"
+        if legacy:
+            sample = small[name][:4000]
+            line += f"   old regex on {len(sample):,} chars: {_best_of(legacy_parse, sample, 1) * 1000:8.1f} ms"
+        print(line + ("" if ok else "  FAIL"))
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check the misconduct-row parser against its corpus")
+    parser.add_argument("--size", type=int, default=250_000, help="Adversarial row length in chars")
+    parser.add_argument("--budget", type=float, default=50.0, help="Allowed ms per 100k chars")
+    parser.add_argument("--legacy", action="store_true", help="Also time the old regex parser")
+    parser.add_argument("--gamesheet", metavar="HTML", help="Saved RAMP gamesheet page to check")
+    args = parser.parse_args()
+
+    failures = check_corpus(fixture_rows(GAMESHEET_FIXTURE), "gamesheet fixture")
+    failures += check_corpus(VALID_ROWS, "valid rows")
+    failures += check_corpus(INVALID_ROWS, "malformed rows")
+    failures += check_name_with_for()
+    if args.gamesheet:
+        rows = gamesheet_rows(args.gamesheet)
+        failures += check_corpus(rows, args.gamesheet)
+        report_node_layout(rows, args.gamesheet)
+    failures += check_timing(args.size, args.budget, args.legacy)
+
+    print(f"\n{'OK' if not failures else f'{failures} failure(s)'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Suspension and severity rules — Python port of web/includes/rules.php.
+
+Only what the read API (serve.py) needs.  Keep the two files in step.
+
+Rule 7.1: 3rd yellow  → 1 match suspension
+Rule 7.2: 5th yellow  → 1 match suspension
+Rule 7.3: 7th+ yellow → 1 match per additional caution (7th, 8th, 9th, …)
+"""
+
+
+def expected_yellow_suspensions(yellows: int) -> int:
+    """Number of suspensions triggered by this many accumulation yellows."""
+    return sum(1 for n in range(1, yellows + 1) if n == 3 or n == 5 or n >= 7)
+
+
+def yellow_status(yellows: int) -> dict:
+    """Status colour class and label for a yellow count (yellow_status())."""
+    if yellows >= 7:
+        return {"class": "status-red",   "label": "Suspension Triggered (Rule 7.3)"}
+    if yellows == 6:
+        return {"class": "status-amber", "label": "Warning — 1 from Rule 7.3"}
+    if yellows >= 5:
+        return {"class": "status-red",   "label": "Suspension Triggered (Rule 7.2)"}
+    if yellows == 4:
+        return {"class": "status-amber", "label": "Warning — 1 from Rule 7.2"}
+    if yellows >= 3:
+        return {"class": "status-red",   "label": "Suspension Triggered (Rule 7.1)"}
+    if yellows == 2:
+        return {"class": "status-amber", "label": "Warning — 1 from Rule 7.1"}
+    return {"class": "status-green", "label": "Clean"}
+
+
+def yellows_until_next(yellows: int) -> int:
+    """How many more yellows until the next suspension threshold?"""
+    if yellows < 2:
+        return 2 - yellows   # heading toward 3
+    if yellows < 3:
+        return 3 - yellows
+    if yellows < 5:
+        return 5 - yellows
+    if yellows < 7:
+        return 7 - yellows
+    return 1  # every subsequent yellow triggers a suspension
+
+
+# (substrings, weight) in priority order, matching weight_sql()'s
+# case-insensitive LIKE '%…%' tests.
+_YELLOW_WEIGHTS = (
+    (("dissent",), 2.5),
+    (("unsporting",), 2.0),
+    (("persistent infringement",), 1.5),
+)
+_RED_WEIGHTS = (
+    (("category a", "violent conduct"), 9.0),
+    (("spitting",), 7.5),
+    (("category d", "foul and abusive", "abuse of an official"), 7.0),
+    (("serious foul play",), 6.0),
+    (("denying obvious",), 4.5),
+    (("second caution",), 3.0),
+)
+
+BENCH_PENALTY = "Bench Penalty"
+
+
+def card_weight(reason: str, card_type: str, player_name: str) -> float:
+    """CSDC-weighted score of one misconduct row, as weight_sql() computes it
+    (including the 1.5× bench multiplier)."""
+    if card_type == "Yellow":
+        table, default = _YELLOW_WEIGHTS, 1.0
+    elif card_type == "Red":
+        table, default = _RED_WEIGHTS, 4.0
+    else:
+        return 0.0
+    text = (reason or "").lower()
+    weight = default
+    for needles, w in table:
+        if any(n in text for n in needles):
+            weight = w
+            break
+    return weight * (1.5 if player_name == BENCH_PENALTY else 1.0)
+
+
+def weight_sql(reason_col: str = "m.reason", card_col: str = "m.card_type",
+               player_col: str = "m.player_name") -> str:
+    """SQL expression equivalent to card_weight() — weight_sql() in rules.php."""
+    def cases(table, default):
+        whens = " ".join(
+            "WHEN " + " OR ".join(f"{reason_col} LIKE '%{n}%'" for n in needles) + f" THEN {w}"
+            for needles, w in table
+        )
+        return f"CASE {whens} ELSE {default} END"
+    return (
+        f"(CASE WHEN {card_col} = 'Yellow' THEN {cases(_YELLOW_WEIGHTS, 1.0)}"
+        f" WHEN {card_col} = 'Red' THEN {cases(_RED_WEIGHTS, 4.0)}"
+        f" ELSE 0.0 END"
+        f" * CASE WHEN {player_col} = '{BENCH_PENALTY}' THEN 1.5 ELSE 1.0 END)"
+    )
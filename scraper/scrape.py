@@ -7,33 +7,51 @@ Usage:
     python scrape.py --update            # Re-scrape stale future fixtures now in the past
     python scrape.py --division 35372    # Single division only
     python scrape.py --status            # Show DB stats, no scraping
+    python scrape.py --publish           # Publish the web snapshot, no scraping
+    python scrape.py --maintain          # Checkpoint, analyze and vacuum the DB
+    python scrape.py --archive-season ID # Move a finished season to the archive DB
+    python scrape.py --apply-corrections # Apply name_corrections to stored rows
 """
 
+from __future__ import annotations
+
 import argparse
 import re
 import sys
 import time
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from urllib.parse import urljoin
 
-import requests
-from bs4 import BeautifulSoup
-
 import db
 from config import BASE_URL, CATID, DIVISIONS, HEADERS, REQUEST_DELAY, ORG_ID, SEASON_IDS
 
+# requests / bs4 / lxml are imported on first fetch so that --status and the
+# other DB-only commands start without loading them.
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
 
 # ---------------------------------------------------------------------------
 # HTTP helpers
 # ---------------------------------------------------------------------------
 
-session = requests.Session()
-session.headers.update(HEADERS)
+_session = None
+
+
+def get_session():
+    global _session
+    if _session is None:
+        import requests
+        _session = requests.Session()
+        _session.headers.update(HEADERS)
+    return _session
 
 
 def fetch(url: str) -> Optional[BeautifulSoup]:
+    import requests
+    from bs4 import BeautifulSoup
     try:
-        resp = session.get(url, timeout=20)
+        resp = get_session().get(url, timeout=20)
         resp.raise_for_status()
         return BeautifulSoup(resp.text, "lxml")
     except requests.RequestException as exc:
@@ -42,8 +60,9 @@ def fetch(url: str) -> Optional[BeautifulSoup]:
 
 
 def fetch_json(url: str) -> Optional[list | dict]:
+    import requests
     try:
-        resp = session.get(url, timeout=20)
+        resp = get_session().get(url, timeout=20)
         resp.raise_for_status()
         return resp.json()
     except requests.RequestException as exc:
@@ -74,16 +93,20 @@ def gamesheet_url(division_id: int, game_id: int) -> str:
 # Games list — fetched via RAMP JSON API
 # ---------------------------------------------------------------------------
 
-def fetch_games_for_division(division_id: int) -> list[dict]:
+def fetch_games_for_division(division_id: int, skip_seasons: set[int] = frozenset()) -> list[dict]:
     """
     Fetch all games for a division across all configured seasons using the
     RAMP JSON API: /api/leaguegame/get/{orgId}/{seasonId}/{catId}/{divId}/0/0/
+    Seasons in skip_seasons (already archived) are not requested.
 
     Returns list of dicts with keys:
-        game_id, game_number, game_date, location, home_team, away_team, gamesheet_link
+        game_id, season_id, game_number, game_date, location, home_team, away_team,
+        gamesheet_link
     """
     games = []
     for season_id in SEASON_IDS:
+        if season_id in skip_seasons:
+            continue
         url = f"{BASE_URL}/api/leaguegame/get/{ORG_ID}/{season_id}/{CATID}/{division_id}/0/0/"
         data = fetch_json(url)
         sleep()
@@ -98,6 +121,7 @@ def fetch_games_for_division(division_id: int) -> list[dict]:
             away = re.sub(r'\s*\(\d+\)\s*$', '', g.get("AwayTeamName") or "").strip()
             games.append({
                 "game_id": int(gid),
+                "season_id": season_id,
                 "game_number": str(g.get("gameNumber") or ""),
                 "game_date": g.get("sDate") or g.get("sDateString") or "",
                 "location": g.get("ArenaName") or "",
@@ -162,7 +186,7 @@ def parse_misconduct_table(soup: BeautifulSoup) -> list[dict]:
             continue
         # Found the right table — parse data rows
         for row in table.find_all("tr")[1:]:
-            cell_text = row.get_text(strip=True)
+            cell_text = row.get_text(_NODE_SEP, strip=True)
             if not cell_text or "no misconduct" in cell_text.lower():
                 continue
             m = _parse_misconduct_line(cell_text)
@@ -175,24 +199,77 @@ def parse_misconduct_table(soup: BeautifulSoup) -> list[dict]:
 
 # RAMP inline misconduct format:
 #   "{Team}at {MM:SS} -#{num} {Name}for {Reason} [{Yellow|Red}]"
-# Note: no spaces before "at" or "for" — they run directly into the text
-_MISCONDUCT_RE = re.compile(
-    r"^(.+?)at\s+(\d{1,2}:\d{2})\s+-\s*(?:#(\d+)\s+)?(.+?)for\s+(.+?)\s+\[(Yellow|Red)\]$",
-    re.IGNORECASE,
-)
+# get_text(strip=True) runs "at"/"for" straight into the text, which suggests
+# team, time, player and reason are separate text nodes (unconfirmed — check a
+# saved page with parsecheck.py --gamesheet).  The row is read with _NODE_SEP
+# between nodes; a marker that starts a node is preferred, so names containing
+# "at"/"for" split correctly, and without node breaks the first match is used,
+# as the old regex did.  Every step is a single forward scan — no lazy groups
+# to backtrack over on long or malformed cells.
+_NODE_SEP = "\x1f"  # matched by \s, so flat-text patterns still apply
+_TIME_RE = re.compile(r"at\s+(\d{1,2}:\d{2})\s+-\s*", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"#(\d+)\s+")
+_FOR_RE = re.compile(r"for\s+", re.IGNORECASE)
+_CARD_RE = re.compile(r"\s\[(Yellow|Red)\]\Z", re.IGNORECASE)
+
+
+def _pick_marker(text: str, pattern: re.Pattern) -> Optional[re.Match]:
+    """First match of pattern that starts a text node, else the first match
+    with something before it."""
+    fallback = None
+    for m in pattern.finditer(text):
+        if m.start() == 0:
+            continue
+        if text[m.start() - 1] == _NODE_SEP:
+            return m
+        if fallback is None:
+            fallback = m
+    return fallback
+
+
+def _clean(text: str) -> str:
+    return text.replace(_NODE_SEP, " ").strip()
+
+
+def _strip_ap(name: str) -> str:
+    """Drop "(AP)" (affiliated player) tags along with surrounding whitespace."""
+    parts = name.split("(AP)")
+    if len(parts) == 1:
+        return name
+    return parts[0].rstrip() + "".join(p.strip() for p in parts[1:-1]) + parts[-1].lstrip()
 
 
 def _parse_misconduct_line(text: str) -> Optional[dict]:
-    m = _MISCONDUCT_RE.match(text)
-    if not m:
+    card = _CARD_RE.search(text)
+    if not card:
         return None
+    body = text[:card.start()].rstrip()
+
+    at = _pick_marker(body, _TIME_RE)
+    if not at:
+        return None
+    team = _clean(body[:at.start()])
+    rest = body[at.end():]
+
+    number = _NUMBER_RE.match(rest)
+    if number:
+        rest = rest[number.end():]
+
+    for_ = _pick_marker(rest, _FOR_RE)
+    if not for_:
+        return None
+    name = _clean(rest[:for_.start()])
+    reason = _clean(rest[for_.end():])
+    if not team or not name or not reason:
+        return None
+
     return {
-        "team":          m.group(1).strip(),
-        "minute":        m.group(2).strip(),
-        "player_number": m.group(3).strip() if m.group(3) else "",
-        "player_name":   re.sub(r'\s*\(AP\)\s*', '', m.group(4)).strip(),
-        "reason":        m.group(5).strip(),
-        "card_type":     m.group(6).capitalize(),
+        "team":          team,
+        "minute":        at.group(1),
+        "player_number": number.group(1) if number else "",
+        "player_name":   _strip_ap(name).strip(),
+        "reason":        reason,
+        "card_type":     card.group(1).capitalize(),
     }
 
 
@@ -301,9 +378,9 @@ def scrape_gamesheet(
     if force:
         db.delete_game_data(conn, game_pk)
 
+    corrections = db.get_name_corrections(conn, game_id)
     misconduct_count = 0
     if not suspensions_only:
-        corrections = db.get_name_corrections(conn, game_id)
         misconducts = parse_misconduct_table(soup)
         for m in misconducts:
             db.insert_misconduct(
@@ -318,7 +395,9 @@ def scrape_gamesheet(
     # Suspensions served (on this gamesheet)
     served = parse_suspensions_served(soup)
     for s in served:
-        db.insert_suspension_served(conn, game_pk, s["player_name"], s["team"])
+        db.insert_suspension_served(
+            conn, game_pk, s["player_name"], s["team"], corrections=corrections,
+        )
 
     db.mark_game_scraped(conn, game_id)
     conn.commit()
@@ -334,7 +413,7 @@ def scrape_division(conn, division_id: int, force: bool = False) -> None:
     name = info.get("name", str(division_id))
     print(f"\n[Division {division_id}] {name}")
 
-    games = fetch_games_for_division(division_id)
+    games = fetch_games_for_division(division_id, db.get_archived_seasons(conn))
     print(f"  Found {len(games)} games via API.")
 
     for game in games:
@@ -343,6 +422,7 @@ def scrape_division(conn, division_id: int, force: bool = False) -> None:
             conn, gid, division_id,
             game["game_number"], game["game_date"],
             game["location"], game["home_team"], game["away_team"],
+            season_id=game["season_id"],
         )
         conn.commit()
 
@@ -361,60 +441,110 @@ def scrape_division(conn, division_id: int, force: bool = False) -> None:
 # Targeted suspension rescrape
 # ---------------------------------------------------------------------------
 
+def _suspension_rescrape_games(conn) -> list:
+    """Live games to re-scrape: each team's games in a division after a
+    player's first suspension trigger there (see cmd_rescrape_suspensions).
+    conn comes from db.get_read_connection(), so unqualified tables span
+    archived seasons and main.games is the live schedule."""
+    return conn.execute("""
+        WITH cards AS (
+            SELECT m.player_id, m.team_id, m.card_type,
+                   g.division_id, g.game_day, g.game_id,
+                   CASE WHEN m.card_type = 'Yellow' THEN
+                       SUM(m.card_type = 'Yellow') OVER (
+                           PARTITION BY m.player_id
+                           ORDER BY g.game_day, g.game_id, m.id
+                           ROWS UNBOUNDED PRECEDING
+                       )
+                   END AS yellow_no
+            FROM misconducts m
+            JOIN games g ON m.game_id = g.id
+            WHERE m.player_name != 'Bench Penalty'
+              AND NOT (m.card_type = 'Yellow' AND EXISTS (
+                  SELECT 1 FROM misconducts m2
+                  WHERE m2.game_id = m.game_id
+                    AND m2.player_id = m.player_id
+                    AND m2.card_type = 'Red'
+              ))
+        ),
+        triggers AS (
+            SELECT player_id, team_id, division_id, game_day, game_id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY player_id, team_id, division_id
+                       ORDER BY game_day, game_id
+                   ) AS n
+            FROM cards
+            WHERE card_type = 'Red' OR yellow_no IN (3, 5) OR yellow_no >= 7
+        )
+        SELECT DISTINCT g.id AS pk, g.game_id, d.division_id AS ext_div_id, g.game_day
+        FROM triggers t
+        JOIN main.games g ON g.division_id = t.division_id
+                         AND (g.home_team_id = t.team_id OR g.away_team_id = t.team_id)
+                         AND CASE
+                             -- An unparseable date on either side: fall back to
+                             -- RAMP game_id order rather than dropping the game.
+                             WHEN g.game_day IS NULL OR t.game_day IS NULL
+                                 THEN g.game_id > t.game_id
+                             ELSE g.game_day > t.game_day
+                                  OR (g.game_day = t.game_day AND g.game_id > t.game_id)
+                         END
+        JOIN divisions d ON g.division_id = d.id
+        WHERE t.n = 1
+        ORDER BY g.game_day ASC, g.game_id ASC
+    """).fetchall()
+
+
 def cmd_rescrape_suspensions(conn) -> None:
     """
-    Re-scrape only the 'Completed Suspensions' section for games that
-    could contain suspension-served entries — i.e. games whose RAMP game_id
-    is >= the earliest game where any player triggered a threshold.
+    Re-scrape only the 'Completed Suspensions' section for games where a
+    served suspension could appear: for each player and team, the team's
+    games in that division after the player's first suspension trigger.
+
+    Triggers follow the web rules — the 3rd, 5th and 7th+ accumulation
+    yellow (yellows from a game with a red don't count) or any red card —
+    ordered by game date, not by RAMP game_id.
+
+    Yellows are counted across archived seasons too, as the web's
+    compliance report does; only live games are re-scraped.
 
     Misconduct data already in the DB is left untouched; only
     suspensions_served rows are refreshed.
     """
-    from collections import defaultdict
-
-    # Load all yellows per player ordered by game_id (proxy for chronology)
-    rows = conn.execute("""
-        SELECT m.player_name, g.game_id
-        FROM misconducts m
-        JOIN games g ON m.game_id = g.id
-        WHERE m.card_type = 'Yellow'
-        ORDER BY m.player_name, g.game_id ASC
-    """).fetchall()
-
-    if not rows:
-        print("No yellow card data in DB — run a full scrape first.")
-        return
-
-    # Find the first game_id where each player hit a threshold (3, 5, 7+)
-    player_games: dict[str, list[int]] = defaultdict(list)
-    for row in rows:
-        player_games[row["player_name"]].append(row["game_id"])
-
-    trigger_game_ids: list[int] = []
-    for name, game_ids in player_games.items():
-        for i, gid in enumerate(game_ids):
-            count = i + 1
-            if count == 3 or count == 5 or count >= 7:
-                trigger_game_ids.append(gid)
-                break  # Only need the first trigger per player
+    reader = db.get_read_connection()
+    try:
+        games = _suspension_rescrape_games(reader)
+    finally:
+        reader.close()
 
-    if not trigger_game_ids:
+    if not games:
         print("No players have hit a suspension threshold yet.")
         return
 
-    min_trigger_gid = min(trigger_game_ids)
-    print(f"Earliest suspension trigger at RAMP game_id {min_trigger_gid}.")
-
-    # All games at or after that trigger
-    games = conn.execute("""
-        SELECT g.id AS pk, g.game_id, d.division_id AS ext_div_id
-        FROM games g
-        JOIN divisions d ON g.division_id = d.id
-        WHERE g.game_id >= ?
-        ORDER BY g.game_id ASC
-    """, (min_trigger_gid,)).fetchall()
+    # What the old "every game after the earliest 3rd yellow by game_id"
+    # approach would have fetched, for comparison.
+    legacy = conn.execute("""
+        SELECT COUNT(*) FROM games
+        WHERE game_id >= (
+            SELECT MIN(game_id) FROM (
+                SELECT g.game_id,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY m.player_id ORDER BY g.game_id
+                       ) AS n
+                FROM misconducts m
+                JOIN games g ON m.game_id = g.id
+                WHERE m.card_type = 'Yellow'
+            ) WHERE n = 3
+        )
+    """).fetchone()[0]
+    total = conn.execute("SELECT COUNT(*) FROM games").fetchone()[0]
 
-    print(f"Games to check: {len(games)} (out of {conn.execute('SELECT COUNT(*) FROM games').fetchone()[0]} total)")
+    print(f"Games to check: {len(games)} (out of {total} total)")
+    undated = sum(1 for g in games if g["game_day"] is None)
+    if undated:
+        print(f"  {undated} of them have no parseable date and were matched by game_id order.")
+    if legacy > len(games):
+        print(f"Saved {legacy - len(games)} fetch(es) vs. rescraping every game "
+              f"after the earliest trigger ({legacy}).")
 
     for game in games:
         db.clear_suspension_data(conn, game["pk"])
@@ -447,10 +577,9 @@ def cmd_update_stale(conn) -> None:
                g.game_date, g.scraped_at
         FROM games g
         JOIN divisions d ON g.division_id = d.id
-        WHERE g.scraped_at IS NOT NULL
-          AND date(g.game_date) <= date('now')
-          AND date(g.scraped_at) < date(g.game_date)
-        ORDER BY g.game_date ASC
+        WHERE g.game_day <= date('now')
+          AND g.scraped_at < g.game_day
+        ORDER BY g.game_day ASC
     """).fetchall()
 
     if not stale:
@@ -477,15 +606,19 @@ def cmd_rescrape_since(conn, since_date: str) -> None:
     Re-scrape all games with game_date >= since_date.
     Clears existing misconduct + suspension data and re-scrapes each gamesheet.
     """
+    since_day = db.normalize_date(since_date)
+    if not since_day:
+        print(f"Unrecognised date {since_date!r} — use YYYY-MM-DD.")
+        return
+
     games = conn.execute("""
         SELECT g.id AS pk, g.game_id, d.division_id AS ext_div_id,
                g.game_date, g.scraped_at
         FROM games g
         JOIN divisions d ON g.division_id = d.id
-        WHERE date(g.game_date) >= ?
-          AND date(g.game_date) <= date('now')
-        ORDER BY g.game_date ASC
-    """, (since_date,)).fetchall()
+        WHERE g.game_day BETWEEN ? AND date('now')
+        ORDER BY g.game_day ASC
+    """, (since_day,)).fetchall()
 
     if not games:
         print(f"No games found on or after {since_date}.")
@@ -505,6 +638,44 @@ def cmd_rescrape_since(conn, since_date: str) -> None:
 # CLI
 # ---------------------------------------------------------------------------
 
+def cmd_archive_season(conn, season_id: int) -> None:
+    """Move a finished season out of the hot tables into the archive DB."""
+    try:
+        counts = db.archive_season(conn, season_id)
+    except ValueError as exc:
+        print(exc)
+        sys.exit(1)
+    print(f"\nArchived season {season_id} to {db.get_archive_path()}:")
+    for table, n in counts.items():
+        print(f"  {table:25s}: {n}")
+
+
+def cmd_apply_corrections(conn) -> None:
+    """Apply name_corrections to rows already in the DB, without fetching."""
+    start = time.monotonic()
+    counts = db.apply_name_corrections(conn)
+    print(f"\nApplied name corrections ({(time.monotonic() - start) * 1000:.0f} ms):")
+    for table, n in counts.items():
+        print(f"  {table:31s}: {n} row(s) updated")
+
+
+def cmd_publish(conn) -> None:
+    """Publish a consistent read-only snapshot for the web pages."""
+    start = time.monotonic()
+    path = db.publish_snapshot(conn)
+    print(f"\nPublished snapshot to {path} ({time.monotonic() - start:.1f}s)")
+
+
+def cmd_maintain(conn) -> None:
+    """Run DB maintenance and report storage before and after."""
+    start = time.monotonic()
+    before, after = db.maintain(conn)
+    print(f"\n=== DB Maintenance ({time.monotonic() - start:.1f}s) ===")
+    print(f"  {'':25s}  {'before':>12s}  {'after':>12s}")
+    for k in before:
+        print(f"  {k:25s}: {before[k]!s:>12s}  {after[k]!s:>12s}")
+
+
 def cmd_status() -> None:
     conn = db.get_connection()
     stats = db.get_stats(conn)
@@ -525,14 +696,35 @@ def main() -> None:
     )
     parser.add_argument(
         "--rescrape-suspensions", action="store_true",
-        help="Re-scrape only the suspensions section for games at/after the earliest "
-             "suspension trigger. Much faster than --full; use after fixing the parser.",
+        help="Re-scrape only the suspensions section for each triggered player's team "
+             "games after their first suspension trigger. Much faster than --full; "
+             "use after fixing the parser.",
     )
     parser.add_argument(
         "--rescrape-since", metavar="DATE",
         help="Re-scrape all games on or after DATE (YYYY-MM-DD). Clears and re-fetches "
              "misconduct and suspension data for every matching game.",
     )
+    parser.add_argument(
+        "--maintain", action="store_true",
+        help="Checkpoint the WAL, run PRAGMA optimize and vacuum free pages, then exit. "
+             "Reports fragmentation and file size before and after.",
+    )
+    parser.add_argument(
+        "--archive-season", type=int, metavar="SEASON_ID",
+        help="Move a finished season's games, misconducts and suspensions into the "
+             "read-only archive DB and stop scraping it. Web pages still show it.",
+    )
+    parser.add_argument(
+        "--apply-corrections", action="store_true",
+        help="Rewrite stored misconduct and suspension rows using name_corrections "
+             "and exit. No gamesheets are fetched.",
+    )
+    parser.add_argument(
+        "--publish", action="store_true",
+        help="Publish the read-only web snapshot from the current DB and exit. "
+             "Every scraping run also publishes on success.",
+    )
     args = parser.parse_args()
 
     db.init_db()
@@ -544,6 +736,20 @@ def main() -> None:
     conn = db.get_connection()
 
     try:
+        if args.maintain:
+            cmd_maintain(conn)
+            return
+        if args.apply_corrections:
+            cmd_apply_corrections(conn)
+            cmd_publish(conn)
+            return
+        if args.archive_season:
+            cmd_archive_season(conn, args.archive_season)
+            cmd_publish(conn)
+            return
+        if args.publish:
+            cmd_publish(conn)
+            return
         if args.update:
             cmd_update_stale(conn)
         elif args.rescrape_since:
@@ -558,6 +764,7 @@ def main() -> None:
         else:
             for div_id in DIVISIONS:
                 scrape_division(conn, div_id, force=args.full)
+        cmd_publish(conn)
     finally:
         conn.close()
 
@@ -0,0 +1,573 @@
+#!/usr/bin/env python3
+"""
+Read-only API server backed by an in-memory model of the scraped data.
+
+Serves the same actions and JSON shapes as web/api.php (players, stats,
+teams, discrepancies, export_csv) without touching SQLite per request.
+The model is loaded once from the published snapshot (or the live DB if
+none has been published), with archived seasons attached, and refreshed
+when the scraper publishes a new snapshot: only games whose rows changed
+are re-read.
+
+Usage:
+    python serve.py                      # Listen on 127.0.0.1:8765
+    python serve.py --port 9000 --poll 5
+    curl 'http://127.0.0.1:8765/api.php?action=players&div_type=mens'
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import sqlite3
+import time
+from decimal import ROUND_HALF_UP, Decimal
+from urllib.parse import parse_qs, urlsplit
+
+import db
+import rules
+
+
+# ---------------------------------------------------------------------------
+# Helpers mirroring PHP semantics
+# ---------------------------------------------------------------------------
+
+def _php_round(value: float, digits: int) -> float:
+    """PHP round(): half away from zero, unlike Python's banker's rounding."""
+    return float(Decimal(repr(value)).quantize(Decimal(1).scaleb(-digits), ROUND_HALF_UP))
+
+
+def _int_param(params: dict, name: str) -> int | None:
+    """isset($_GET[name]) && $_GET[name] !== '' ? (int) $_GET[name] : null"""
+    value = params.get(name, "")
+    if value == "":
+        return None
+    try:
+        return int(value.strip())
+    except ValueError:
+        return 0
+
+
+def _split_concat(values) -> list[str]:
+    """array_unique(explode(',', GROUP_CONCAT(DISTINCT …))), sorted."""
+    return sorted({part for v in values for part in v.split(",")})
+
+
+def get_source_path() -> str:
+    """The DB the web pages read: the published snapshot if present."""
+    snapshot = db.get_snapshot_path()
+    return snapshot if os.path.exists(snapshot) else db.get_db_path()
+
+
+# ---------------------------------------------------------------------------
+# In-memory model
+# ---------------------------------------------------------------------------
+
+class Model:
+    """
+    Raw rows per game plus precomputed aggregates.
+
+    refresh() re-reads only games whose signature (game fields, plus the
+    row count and player_id / team_id totals of their misconducts, and the
+    row count and player_id total of their served suspensions) changed
+    since the last load, then rebuilds the aggregates in memory.
+    """
+
+    def __init__(self) -> None:
+        self.divisions: dict[int, dict] = {}
+        self.games: dict[int, dict] = {}
+        self.cards: dict[int, list[dict]] = {}
+        self.served: dict[int, list[str]] = {}
+        self.signatures: dict[int, tuple] = {}
+        self.loaded_at: float = 0.0
+
+        # Aggregates — rebuilt together by _derive().
+        self.buckets: dict[tuple, list] = {}
+        self.compliance: dict[str, dict] = {}
+        self.team_rows: list[tuple[int, dict]] = []
+        self.discrepancy_rows: list[dict] = []
+        self.stats: dict = {}
+
+        # Encoded responses keyed by (action, params); the model is immutable
+        # between refreshes, so repeated page loads are a dict lookup.
+        self.responses: dict[tuple, tuple] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        path = get_source_path()
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        conn.row_factory = sqlite3.Row
+        db.attach_archive(conn)
+        return conn
+
+    def refresh(self) -> int:
+        """Sync with the DB; returns how many games were (re)loaded or dropped."""
+        conn = self._connect()
+        try:
+            self.divisions = {
+                r["id"]: dict(r) for r in conn.execute(
+                    "SELECT id, division_id, name, type FROM divisions"
+                )
+            }
+            games = {
+                r["id"]: dict(r) for r in conn.execute("""
+                    SELECT id, division_id, scraped_at, game_day,
+                           home_team_id, away_team_id
+                    FROM games
+                """)
+            }
+            card_sigs = {
+                r[0]: tuple(r[1:]) for r in conn.execute("""
+                    SELECT game_id, COUNT(*), TOTAL(player_id), TOTAL(team_id)
+                    FROM misconducts GROUP BY game_id
+                """)
+            }
+            served_sigs = {
+                r[0]: tuple(r[1:]) for r in conn.execute("""
+                    SELECT game_id, COUNT(*), TOTAL(player_id)
+                    FROM suspensions_served GROUP BY game_id
+                """)
+            }
+            signatures = {
+                pk: (tuple(g.values()), card_sigs.get(pk), served_sigs.get(pk))
+                for pk, g in games.items()
+            }
+
+            changed = [pk for pk, sig in signatures.items() if self.signatures.get(pk) != sig]
+            removed = [pk for pk in self.signatures if pk not in signatures]
+            if not changed and not removed and self.loaded_at:
+                return 0
+            for pk in removed:
+                self.cards.pop(pk, None)
+                self.served.pop(pk, None)
+
+            pks = json.dumps(changed)
+            for pk in changed:
+                self.cards[pk] = []
+                self.served[pk] = []
+            for r in conn.execute("""
+                SELECT game_id, player_name, player_id, team, team_id, reason, card_type
+                FROM misconducts
+                WHERE game_id IN (SELECT value FROM json_each(?))
+                ORDER BY id
+            """, (pks,)):
+                self.cards[r["game_id"]].append(dict(r))
+            for r in conn.execute("""
+                SELECT game_id, player_name FROM suspensions_served
+                WHERE game_id IN (SELECT value FROM json_each(?))
+            """, (pks,)):
+                self.served[r["game_id"]].append(r["player_name"])
+        finally:
+            conn.close()
+
+        self.games = games
+        self.signatures = signatures
+        self._derive()
+        self.responses = {}
+        self.loaded_at = time.time()
+        return len(changed) + len(removed)
+
+    def updated(self) -> tuple["Model", int]:
+        """
+        A refreshed copy of this model and how many games changed; self is
+        left untouched.  Requests keep reading the current model until the
+        caller swaps the new one in with a single assignment, so none sees
+        raw rows from one load and aggregates from another.
+        """
+        new = Model()
+        new.divisions, new.games = self.divisions, self.games
+        new.cards, new.served = dict(self.cards), dict(self.served)
+        new.signatures, new.loaded_at = dict(self.signatures), self.loaded_at
+        changed = new.refresh()
+        return (new if changed else self), changed
+
+    def _derive(self) -> None:
+        games, divisions = self.games, self.divisions
+
+        buckets: dict[tuple, list] = {}       # (player, div pk, team) → [yellows, reds, weight]
+        joined: dict[str, list] = {}          # player → [yellows, reds, teams, div names]
+        everywhere: dict[object, list] = {}   # player_id → [yellows, reds], no division join
+        teams: dict[tuple, dict] = {}         # (team_id, div pk) → action=teams row
+        total_yellows = total_reds = 0
+
+        for pk, rows in self.cards.items():
+            div = games[pk]["division_id"] if pk in games else None
+            in_division = div in divisions
+            # Yellows from a game where the player also got a red are a
+            # two-yellow ejection and don't count toward accumulation.
+            red_players = {r["player_id"] for r in rows if r["card_type"] == "Red"}
+            for r in rows:
+                name, card = r["player_name"], r["card_type"]
+                is_yellow, is_red = card == "Yellow", card == "Red"
+                accumulates = is_yellow and r["player_id"] not in red_players
+                total_yellows += is_yellow
+                total_reds += is_red
+                e = everywhere.setdefault(r["player_id"], [0, 0])
+                e[0] += accumulates
+                e[1] += is_red
+                if not in_division:
+                    continue
+
+                weight = rules.card_weight(r["reason"], card, name)
+                bench = name == rules.BENCH_PENALTY
+                j = joined.setdefault(name, [0, 0, set(), set()])
+                j[0] += accumulates
+                j[1] += is_red
+                j[2].add(r["team"])
+                j[3].add(divisions[div]["name"])
+
+                if not bench:
+                    b = buckets.setdefault((name, div, r["team"]), [0, 0, 0.0])
+                    b[0] += accumulates
+                    b[1] += is_red
+                    b[2] += weight
+
+                t = teams.get((r["team_id"], div))
+                if t is None:
+                    t = teams[(r["team_id"], div)] = {
+                        "team": r["team"], "division": divisions[div]["name"],
+                        "yellows": 0, "reds": 0, "bench_yellows": 0, "bench_reds": 0,
+                        "total_cards": 0, "players": set(), "weight": 0.0,
+                    }
+                t["bench_yellows" if bench else "yellows"] += is_yellow
+                t["bench_reds" if bench else "reds"] += is_red
+                t["total_cards"] += 1
+                t["weight"] += weight
+                if not bench:
+                    t["players"].add(r["player_id"])
+
+        served: dict[str, int] = {}
+        for pk, names in self.served.items():
+            if pk in games and games[pk]["division_id"] in divisions:
+                for name in names:
+                    served[name] = served.get(name, 0) + 1
+
+        compliance = {}
+        for name, (yellows, reds, _, _) in joined.items():
+            expected = rules.expected_yellow_suspensions(yellows) + reds
+            unserved = max(0, expected - served.get(name, 0))
+            compliance[name] = {
+                "expected_count": expected,
+                "served_count":   served.get(name, 0),
+                "unserved_count": unserved,
+                "fully_compliant": unserved == 0,
+            }
+
+        games_played: dict[tuple, int] = {}
+        for g in games.values():
+            for team_id in {g["home_team_id"], g["away_team_id"]} - {None}:
+                key = (team_id, g["division_id"])
+                games_played[key] = games_played.get(key, 0) + 1
+
+        team_rows = []   # (division pk, row)
+        for key in sorted(teams, key=lambda k: (k[0] is not None, k[0] or 0, k[1])):
+            t = teams[key]
+            gp = games_played.get(key, 0)
+            team_rows.append((key[1], {
+                "team":             t["team"],
+                "division":         t["division"],
+                "yellows":          t["yellows"],
+                "reds":             t["reds"],
+                "bench_yellows":    t["bench_yellows"],
+                "bench_reds":       t["bench_reds"],
+                "total_cards":      t["total_cards"],
+                "unique_players":   len(t["players"]),
+                "games_played":     gp,
+                "discipline_score": _php_round(t["weight"] / max(gp, 1), 2),
+            }))
+        team_rows.sort(key=lambda r: -r[1]["discipline_score"])
+
+        discrepancy_rows = []
+        for name, (yellows, reds, team_names, div_names) in sorted(
+            joined.items(), key=lambda kv: (-kv[1][0], kv[0])
+        ):
+            report = compliance[name]
+            if (yellows < 3 and reds < 1) or report["unserved_count"] <= 0:
+                continue
+            discrepancy_rows.append({
+                "name":           name,
+                "expected_count": report["expected_count"],
+                "served_count":   report["served_count"],
+                "unserved_count": report["unserved_count"],
+                "teams":          _split_concat(team_names),
+                "divisions":      sorted(div_names),
+            })
+        discrepancy_rows.sort(key=lambda r: -r["unserved_count"])
+
+        scraped = [g["scraped_at"] for g in games.values() if g["scraped_at"]]
+        self.stats = {
+            "total_yellows":        total_yellows,
+            "total_reds":           total_reds,
+            "suspension_due_count": sum(
+                1 for y, r in everywhere.values()
+                if rules.yellow_status(y)["class"] == "status-red" or r > 0
+            ),
+            "last_scraped":         max(scraped) if scraped else None,
+        }
+        self.buckets = buckets
+        self.compliance = compliance
+        self.team_rows = team_rows
+        self.discrepancy_rows = discrepancy_rows
+
+    # -- division filters shared by players / teams ------------------------
+
+    def _division_filter(self, params: dict):
+        div_type = params.get("div_type", "all")
+        division_id = _int_param(params, "division_id")
+
+        def matches(div_pk) -> bool:
+            d = self.divisions.get(div_pk)
+            if d is None:
+                return False
+            if div_type != "all" and d["type"] != div_type:
+                return False
+            return division_id is None or d["division_id"] == division_id
+        return matches
+
+    # -- actions ------------------------------------------------------------
+
+    def players(self, params: dict) -> dict:
+        """action=players — fetch_players() in api.php."""
+        in_scope = self._division_filter(params)
+        team_search = params.get("team", "").lower()
+        min_yellows = _int_param(params, "min_yellows")
+        max_yellows = _int_param(params, "max_yellows")
+        per_division = params.get("mode", "combined") == "per_division"
+
+        groups: dict[tuple, list] = {}
+        for (name, div, team), (yellows, reds, weight) in self.buckets.items():
+            if not in_scope(div) or (team_search and team_search not in team.lower()):
+                continue
+            g = groups.setdefault((name, div if per_division else None), [0, 0, 0.0, set(), set()])
+            g[0] += yellows
+            g[1] += reds
+            g[2] += weight
+            g[3].add(team)
+            g[4].add(self.divisions[div]["name"])
+
+        players = []
+        for (name, _), (yellows, reds, weight, team_names, div_names) in groups.items():
+            if min_yellows is not None and yellows < min_yellows:
+                continue
+            if max_yellows is not None and yellows > max_yellows:
+                continue
+            status = rules.yellow_status(yellows)
+            report = self.compliance.get(name)
+            if (yellows >= 3 or reds > 0) and report and report["expected_count"]:
+                if report["fully_compliant"]:
+                    served_label, served_class = "✓ Served", "text-green-700 font-medium"
+                else:
+                    served_label = f"{report['unserved_count']} unserved"
+                    served_class = "text-red-600 font-semibold"
+            else:
+                served_label, served_class = "—", "text-gray-400"
+            players.append({
+                "name":           name,
+                "teams":          _split_concat(team_names),
+                "divisions":      sorted(div_names),
+                "yellow_count":   yellows,
+                "red_count":      reds,
+                "danger_score":   _php_round(weight, 1),
+                "status_class":   status["class"],
+                "status_label":   status["label"],
+                "next_threshold": rules.yellows_until_next(yellows),
+                "served_label":   served_label,
+                "served_class":   served_class,
+            })
+        players.sort(key=lambda p: (-p["yellow_count"], -p["red_count"], p["name"], p["divisions"]))
+
+        total_games = sum(
+            1 for g in self.games.values()
+            if g["scraped_at"] is not None and in_scope(g["division_id"])
+        )
+        return {
+            "players": players,
+            "stats": {
+                "total_yellows":  sum(p["yellow_count"] for p in players),
+                "total_reds":     sum(p["red_count"] for p in players),
+                "suspension_due": sum(1 for p in players if p["status_class"] == "status-red"),
+                "total_games":    total_games,
+                "total_divs":     len({d for p in players for d in p["divisions"]}),
+                "total_teams":    len({t for p in players for t in p["teams"]}),
+            },
+        }
+
+    def teams(self, params: dict) -> list[dict]:
+        """action=teams — handle_teams() in api.php."""
+        in_scope = self._division_filter(params)
+        return [row for div, row in self.team_rows if in_scope(div)]
+
+    def discrepancies(self, params: dict) -> list[dict]:
+        """action=discrepancies — handle_discrepancies() in api.php.  The mode
+        parameter is accepted but, as there, reports are always combined."""
+        return self.discrepancy_rows
+
+    def export_csv(self, params: dict) -> str:
+        """action=export_csv — handle_export_csv() in api.php."""
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(["Player", "Teams", "Divisions", "Yellows", "Reds", "Status"])
+        for p in self.players(params)["players"]:
+            writer.writerow([
+                p["name"], "; ".join(p["teams"]), "; ".join(p["divisions"]),
+                p["yellow_count"], p["red_count"], p["status_label"],
+            ])
+        return out.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+_REASONS = {200: "OK", 400: "Bad Request", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+_RESPONSE_CACHE_SIZE = 512
+
+
+def handle(model: Model, target: str) -> tuple[int, dict, bytes]:
+    """Serve a request target (path?query) from the model's response cache."""
+    query = parse_qs(urlsplit(target).query, keep_blank_values=True)
+    params = {k: v[-1] for k, v in query.items()}
+    key = tuple(sorted(params.items()))
+    cache = model.responses
+    response = cache.get(key)
+    if response is None:
+        response = _dispatch(model, params)
+        if len(cache) >= _RESPONSE_CACHE_SIZE:
+            cache.clear()
+        cache[key] = response
+    return response
+
+
+def _dispatch(model: Model, params: dict) -> tuple[int, dict, bytes]:
+    """Dispatch one request to (status, headers, body)."""
+    action = params.get("action", "")
+    json_type = {"Content-Type": "application/json; charset=utf-8"}
+
+    def as_json(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    if action == "players":
+        return 200, json_type, as_json(model.players(params))
+    if action == "stats":
+        return 200, json_type, as_json(model.stats)
+    if action == "teams":
+        return 200, json_type, as_json(model.teams(params))
+    if action == "discrepancies":
+        return 200, json_type, as_json(model.discrepancies(params))
+    if action == "export_csv":
+        return 200, {
+            "Content-Type": "text/csv; charset=utf-8",
+            "Content-Disposition": 'attachment; filename="misconducts.csv"',
+        }, model.export_csv(params).encode()
+    return 400, json_type, as_json({"error": "Unknown action"})
+
+
+class ModelSlot:
+    """The model requests are served from; watch() replaces it whole."""
+
+    def __init__(self, model: Model) -> None:
+        self.model = model
+
+
+async def serve_connection(slot: ModelSlot, reader: asyncio.StreamReader,
+                           writer: asyncio.StreamWriter) -> None:
+    """HTTP/1.1 with keep-alive; GET only, no request bodies."""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = (lines[0].split(" ") + ["", "", ""])[:3]
+            headers = {
+                k.strip().lower(): v.strip()
+                for k, _, v in (line.partition(":") for line in lines[1:] if line)
+            }
+            keep_alive = (
+                headers.get("connection", "").lower() != "close"
+                and version == "HTTP/1.1"
+            )
+            if method != "GET":
+                status, extra, body = 405, {"Content-Type": "text/plain"}, b""
+            else:
+                try:
+                    status, extra, body = handle(slot.model, target)
+                except Exception as exc:
+                    print(f"  [WARN] {target}: {exc!r}")
+                    status, extra, body = 500, {"Content-Type": "application/json"}, \
+                        b'{"error":"Internal error"}'
+            response = [f"HTTP/1.1 {status} {_REASONS[status]}"]
+            response += [f"{k}: {v}" for k, v in extra.items()]
+            response += [
+                f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                "", "",
+            ]
+            writer.write("\r\n".join(response).encode() + body)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def _source_stamp() -> tuple:
+    """mtimes of everything the model reads, to detect a new publish."""
+    paths = (get_source_path(), get_source_path() + "-wal", db.get_archive_path())
+    return tuple(os.stat(p).st_mtime_ns if os.path.exists(p) else None for p in paths)
+
+
+async def watch(slot: ModelSlot, poll: float) -> None:
+    """Reload the model whenever the scraper publishes a new snapshot."""
+    stamp = _source_stamp()
+    while True:
+        await asyncio.sleep(poll)
+        current = _source_stamp()
+        if current == stamp:
+            continue
+        stamp = current
+        start = time.monotonic()
+        try:
+            slot.model, changed = await asyncio.to_thread(slot.model.updated)
+        except sqlite3.Error as exc:
+            print(f"  [WARN] Reload failed: {exc}")
+            continue
+        print(f"Reloaded {changed} game(s) in {(time.monotonic() - start) * 1000:.0f} ms")
+
+
+async def run(host: str, port: int, poll: float) -> None:
+    model = Model()
+    start = time.monotonic()
+    games = model.refresh()
+    print(f"Loaded {games} game(s) from {get_source_path()} "
+          f"in {(time.monotonic() - start) * 1000:.0f} ms")
+
+    slot = ModelSlot(model)
+    server = await asyncio.start_server(
+        lambda r, w: serve_connection(slot, r, w), host, port
+    )
+    print(f"Serving on http://{host}:{port}/api.php")
+    async with server:
+        await asyncio.gather(server.serve_forever(), watch(slot, poll))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-memory read API for the misconduct DB")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--poll", type=float, default=2.0, metavar="SECONDS",
+        help="How often to check for a newly published snapshot (default 2s)",
+    )
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.host, args.port, args.poll))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
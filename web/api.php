@@ -76,12 +76,13 @@ function fetch_players(PDO $pdo): array {
 
     /* ---- Build the aggregation query ---- */
 
+    // Group on the interned ids rather than the names (1:1, integer compares).
     if ($mode === 'per_division') {
         $select_extra = "d.name AS division_name";
-        $group_by     = "m.player_name, d.id";
+        $group_by     = "m.player_id, d.id";
     } else {
         $select_extra = "GROUP_CONCAT(DISTINCT d.name) AS division_names";
-        $group_by     = "m.player_name";
+        $group_by     = "m.player_id";
     }
 
     // Yellows from games where the player also received a red card are excluded:
@@ -96,7 +97,7 @@ function fetch_players(PDO $pdo): array {
                       AND NOT EXISTS (
                           SELECT 1 FROM misconducts m2
                           WHERE m2.game_id = m.game_id
-                            AND m2.player_name = m.player_name
+                            AND m2.player_id = m.player_id
                             AND m2.card_type = 'Red'
                       ) THEN 1 ELSE 0 END) AS yellow_count,
             SUM(CASE WHEN m.card_type = 'Red' THEN 1 ELSE 0 END) AS red_count,
@@ -238,12 +239,12 @@ function handle_stats(PDO $pdo): void {
                          AND NOT EXISTS (
                              SELECT 1 FROM misconducts m2
                              WHERE m2.game_id = m.game_id
-                               AND m2.player_name = m.player_name
+                               AND m2.player_id = m.player_id
                                AND m2.card_type = 'Red'
                          ) THEN 1 ELSE 0 END) AS yc,
                SUM(CASE WHEN m.card_type = 'Red' THEN 1 ELSE 0 END) AS rc
         FROM misconducts m
-        GROUP BY m.player_name
+        GROUP BY m.player_id
     ")->fetchAll();
 
     $suspension_due = 0;
@@ -296,16 +297,16 @@ function handle_teams(PDO $pdo): void {
             SUM(CASE WHEN m.card_type='Yellow' AND m.player_name  = 'Bench Penalty' THEN 1 ELSE 0 END) AS bench_yellows,
             SUM(CASE WHEN m.card_type='Red'    AND m.player_name  = 'Bench Penalty' THEN 1 ELSE 0 END) AS bench_reds,
             COUNT(*)                                                                                     AS total_cards,
-            COUNT(DISTINCT CASE WHEN m.player_name != 'Bench Penalty' THEN m.player_name END)           AS unique_players,
+            COUNT(DISTINCT CASE WHEN m.player_name != 'Bench Penalty' THEN m.player_id END)             AS unique_players,
             SUM($w)                                                                                      AS discipline_weight,
             (SELECT COUNT(*) FROM games g2
-             WHERE (g2.home_team = m.team OR g2.away_team = m.team)
+             WHERE (g2.home_team_id = m.team_id OR g2.away_team_id = m.team_id)
                AND g2.division_id = d.id)                                                               AS games_played
         FROM misconducts m
         JOIN games g      ON m.game_id     = g.id
         JOIN divisions d  ON g.division_id = d.id
         {$where_clause}
-        GROUP BY m.team, d.id
+        GROUP BY m.team_id, d.id
     ";
 
     $stmt = $pdo->prepare($sql);
@@ -352,14 +353,14 @@ function handle_discrepancies(PDO $pdo): void {
                       AND NOT EXISTS (
                           SELECT 1 FROM misconducts m2
                           WHERE m2.game_id = m.game_id
-                            AND m2.player_name = m.player_name
+                            AND m2.player_id = m.player_id
                             AND m2.card_type = 'Red'
                       ) THEN 1 ELSE 0 END) AS yc,
             SUM(CASE WHEN m.card_type = 'Red' THEN 1 ELSE 0 END) AS rc
         FROM misconducts m
         JOIN games g      ON m.game_id     = g.id
         JOIN divisions d  ON g.division_id = d.id
-        GROUP BY m.player_name
+        GROUP BY m.player_id
         HAVING yc >= 3 OR rc >= 1
         ORDER BY yc DESC
     ");
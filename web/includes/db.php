@@ -1,5 +1,10 @@
 <?php
 define('DB_PATH',       __DIR__ . '/../../data/cards.db');
+// Read-only snapshot published by the scraper at the end of each run.
+// Preferred over DB_PATH so pages never see a half-scraped game.
+define('SNAPSHOT_PATH', __DIR__ . '/../../data/cards.published.db');
+// Closed seasons moved out of the live DB by `scrape.py --archive-season`.
+define('ARCHIVE_PATH',  __DIR__ . '/../../data/cards.archive.db');
 define('RAMP_BASE_URL', 'https://fcregina.com');
 define('RAMP_CATID',    3935);
 
@@ -10,14 +15,54 @@ function gamesheet_url(int $division_id, int $game_id): string {
 function get_pdo(): PDO {
     static $pdo = null;
     if ($pdo === null) {
-        if (!file_exists(DB_PATH)) {
+        $path = file_exists(SNAPSHOT_PATH) ? SNAPSHOT_PATH : DB_PATH;
+        if (!file_exists($path)) {
             die("Database not found. Run the scraper first: python scrape.py");
         }
-        $pdo = new PDO('sqlite:' . DB_PATH, null, null, [
+        $options = [
             PDO::ATTR_ERRMODE            => PDO::ERRMODE_EXCEPTION,
             PDO::ATTR_DEFAULT_FETCH_MODE => PDO::FETCH_ASSOC,
-        ]);
+        ];
+        if ($path === SNAPSHOT_PATH) {
+            $options[PDO::SQLITE_ATTR_OPEN_FLAGS] = PDO::SQLITE_OPEN_READONLY;
+        }
+        $pdo = new PDO('sqlite:' . $path, null, null, $options);
         $pdo->exec("PRAGMA foreign_keys = ON");
+        $has_archive_log = $pdo->query(
+            "SELECT 1 FROM sqlite_master WHERE name = 'archived_seasons'"
+        )->fetchColumn();
+        if (file_exists(ARCHIVE_PATH) && $has_archive_log) {
+            attach_archive($pdo);
+        }
     }
     return $pdo;
 }
+
+/**
+ * Attach the season archive and shadow the fact tables with TEMP views over
+ * live + archived rows, so every page keeps seeing all seasons.  Archived
+ * rows only show for seasons listed in this DB's own archived_seasons, so a
+ * snapshot that still holds a just-archived season never counts it twice.
+ * Mirrors attach_archive() in scraper/db.py.
+ */
+function attach_archive(PDO $pdo): void {
+    $pdo->exec("ATTACH DATABASE " . $pdo->quote(ARCHIVE_PATH) . " AS archive");
+    $seasons = "SELECT season_id FROM main.archived_seasons";
+    foreach (['misconducts', 'suspensions_served', 'printable_suspensions', 'games'] as $table) {
+        $cols     = array_column($pdo->query("PRAGMA main.table_info($table)")->fetchAll(), 'name');
+        $archived = array_column($pdo->query("PRAGMA archive.table_info($table)")->fetchAll(), 'name');
+        $archive_cols = array_map(
+            fn($c) => in_array($c, $archived, true) ? $c : "NULL AS $c",
+            $cols
+        );
+        $visible = $table === 'games'
+            ? "season_id IN ($seasons)"
+            : "game_id IN (SELECT id FROM archive.games WHERE season_id IN ($seasons))";
+        $pdo->exec("
+            CREATE TEMP VIEW IF NOT EXISTS $table AS
+            SELECT " . implode(', ', $cols) . " FROM main.$table
+            UNION ALL
+            SELECT " . implode(', ', $archive_cols) . " FROM archive.$table WHERE $visible
+        ");
+    }
+}